@@ -12,7 +12,10 @@ ROBOT_IP = "10.186.13.49"  # <<< CHANGE THIS to your Pepper's actual IP address
 ROBOT_PORT = 9559
 
 # --- LLM API Keys ---
-# Get your keys from the respective provider websites.
+# Get your keys from the respective provider websites. Each entry can be
+# a single key, or a list of keys to rotate across
+# (e.g. "openai": ["KEY_A", "KEY_B"]) if you have several and want to
+# spread rate limits.
 API_KEYS = {
     "openai": "INSERT_KEY_HERE",
     "google": "INSERT_KEY_HERE",
@@ -20,6 +23,12 @@ API_KEYS = {
     "deepseek": "INSERT_KEY_HERE"
 }
 
+# --- Security Tuning (optional) ---
+# bcrypt work factor for PIN hashing; 12 is a good default.
+BCRYPT_ROUNDS = 12
+# Secret for signing session tokens. Set this to a long random string.
+SESSION_KEY = "CHANGE_ME_TO_A_LONG_RANDOM_STRING"
+
 # --- OLLAMA Configuration ---
 # The URL where your local Ollama instance is running.
 OLLAMA_BASE_URL = "http://localhost:11434"
\ No newline at end of file
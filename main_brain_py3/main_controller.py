@@ -19,12 +19,13 @@ from services.utils import setup_logging
 # Import the new settings file for global configuration
 import settings
 
-# Import all the necessary service classes
+# Import the lightweight service classes.
+# NOTE: LLMGateway, LangChainOrchestrator, and AnalyticsManager are imported
+# lazily inside login() instead. The orchestrator transitively pulls in the
+# whole LangChain/FAISS/OpenAI stack, which costs seconds of import time on a
+# cold start — and none of it is needed until a user has actually logged in.
 from services.database_manager import DatabaseManager
 from services.robot_proxy import RobotProxy
-from services.llm_gateway import LLMGateway
-from services.langchain_orchestrator import LangChainOrchestrator
-from services.analytics_manager import AnalyticsManager
 
 # --- Initial Setup ---
 # Set up the logger for the entire application. This should be the first thing we do.
@@ -57,6 +58,7 @@ class PuzzleTutorApp:
         # These services are initialized after a successful login because they
         # may depend on the specific user who is logged in.
         self.current_user = None
+        self.session_token = None
         self.analytics = None
         self.llm_gateway = None
         self.orchestrator = None
@@ -88,8 +90,19 @@ class PuzzleTutorApp:
         if self.current_user:
             self.robot.say("Login successful. Let's begin the session.")
 
+            # Issue a signed session token so any later re-auth check is a
+            # fast HMAC validation rather than another bcrypt run.
+            self.session_token = self.db.issue_session_token(
+                self.current_user['id'])
+
             # --- Initialize user-specific services ---
             # Now that we have a user, we can create the services that need a user_id.
+            # These imports are deferred to this point so the heavy
+            # LangChain/FAISS/OpenAI stack is only loaded once it is needed.
+            from services.analytics_manager import AnalyticsManager
+            from services.llm_gateway import LLMGateway
+            from services.langchain_orchestrator import LangChainOrchestrator
+
             self.analytics = AnalyticsManager(self.db)
             self.llm_gateway = LLMGateway()
             self.orchestrator = LangChainOrchestrator(self.llm_gateway)
@@ -107,8 +120,15 @@ class PuzzleTutorApp:
         # A list of puzzle IDs to run in this session.
         puzzles_to_play = ["puzzle_01", "puzzle_02", "puzzle_03"]
 
+        # Prefetch every puzzle for the session in a single SQL round-trip.
+        puzzles = self.db.get_puzzles(puzzles_to_play)
+
         for puzzle_id in puzzles_to_play:
-            self.run_puzzle(puzzle_id)
+            puzzle = puzzles.get(puzzle_id)
+            if not puzzle:
+                logger.error(f"Could not find puzzle with ID: {puzzle_id}")
+                continue
+            self.run_puzzle(puzzle)
             time.sleep(2)  # A brief pause between puzzles
             # Don't say this after the last puzzle
             if puzzle_id != puzzles_to_play[-1]:
@@ -119,25 +139,31 @@ class PuzzleTutorApp:
         self.robot.say(
             "You've completed all the puzzles for today! You did a fantastic job. Goodbye!")
         self.robot.rest()
+
+        # Write out any analytics rows still sitting in the batch buffer.
+        self.analytics.flush()
         logger.info("Puzzle session finished successfully.")
 
-    def run_puzzle(self, puzzle_id: str):
+    def run_puzzle(self, puzzle: dict):
         """
-        Manages the logic for a single puzzle interaction.
+        Manages the logic for a single puzzle interaction. The puzzle dict
+        is passed in by run_puzzle_session, which prefetches all puzzles
+        for the session in one query.
         """
         logger.info(
-            f"--- Starting puzzle: {puzzle_id} for user: {self.current_user['username']} ---")
-        puzzle = self.db.get_puzzle(puzzle_id)
-        if not puzzle:
-            logger.error(f"Could not find puzzle with ID: {puzzle_id}")
-            return
+            "--- Starting puzzle: %s for user: %s ---",
+            puzzle['puzzle_id'], self.current_user['username'])
 
         self.robot.show_image(puzzle['image_url'])
         self.robot.say(puzzle['question'])
 
+        # The vocabulary never changes within a puzzle, so build it once
+        # (as an immutable tuple) instead of allocating a fresh list on
+        # every loop iteration.
+        vocabulary = ("hint", "help", "quit", "skip",
+                      *sorted(puzzle['solution_keywords']))
+
         while True:
-            vocabulary = ["hint", "help", "quit", "skip"] + \
-                puzzle['solution_keywords']
             user_input = self.robot.listen(vocabulary, timeout=15)
 
             if not user_input:
@@ -161,7 +187,9 @@ class PuzzleTutorApp:
                     "That's a good thought. Let me check for a hint.")
 
                 # --- NEW: Controller-managed analytics logging ---
-                start_time = time.time()
+                # perf_counter_ns is monotonic (immune to NTP clock jumps)
+                # and has much finer resolution than time.time().
+                start_ns = time.perf_counter_ns()
 
                 # Call the orchestrator to get the hint. Note how we pass the user's profile.
                 hint = self.orchestrator.generate_hint(
@@ -170,7 +198,7 @@ class PuzzleTutorApp:
                     user_profile=self.current_user['profile']
                 )
 
-                response_time = time.time() - start_time
+                response_time = (time.perf_counter_ns() - start_ns) / 1e9
 
                 # The controller is now responsible for logging the call.
                 self.analytics.log_llm_call(
@@ -187,6 +215,15 @@ def main():
     The main entry point for the AI Brain application.
     """
     logger.info("AI Brain application starting up...")
+
+    # Fail fast on missing/placeholder API keys or robot settings instead of
+    # surfacing them deep inside the LLM stack after login.
+    try:
+        settings.validate()
+    except ValueError as e:
+        logger.critical(f"Configuration is invalid, cannot start: {e}")
+        sys.exit(1)
+
     try:
         app = PuzzleTutorApp()
         # The session will only run if the login is successful.
@@ -17,7 +17,10 @@
 #  managing API costs, and understanding user engagement.
 # ==============================================================================
 
+import atexit
 import logging
+import queue
+import threading
 import time
 
 # This import is for "type hinting". It tells our code editor that this
@@ -31,25 +34,43 @@ class AnalyticsManager:
     """
     A service class to handle logging of usage analytics to the database.
     """
-    
-    def __init__(self, db_manager: DatabaseManager):
+
+    # Sentinel telling the writer thread to flush and shut down.
+    _SENTINEL = object()
+
+    def __init__(self, db_manager: DatabaseManager, flush_threshold: int = 16):
         """
         Initializes the AnalyticsManager. It doesn't create its own database
         connection; instead, it uses the one provided to it. This is more
         efficient as it prevents multiple, redundant connections to the database file.
 
+        Rows are handed to a background writer thread through a queue, so the
+        interaction loop never waits on SQLite. The writer still batches rows
+        and commits via executemany: every commit forces an fsync, so one
+        INSERT+commit per hint would serialize the loop on disk writes.
+
         Args:
             db_manager (DatabaseManager): An active and initialized instance
                                           of the DatabaseManager service.
+            flush_threshold (int): How many buffered rows trigger an automatic
+                                   flush to the database.
         """
         self.db_manager = db_manager
-        logger.info("AnalyticsManager initialized.")
+        self._flush_threshold = flush_threshold
+        self._q = queue.Queue()
+        self._writer_thread = threading.Thread(
+            target=self._writer, name="analytics-writer", daemon=True)
+        self._writer_thread.start()
+        # Make sure buffered rows are not lost if the app exits without an
+        # explicit close (e.g., a crash in the main loop).
+        atexit.register(self.close)
+        logger.info("AnalyticsManager initialized (background writer running).")
 
     def log_llm_call(self, user_id: int, model_name: str, response_time: float):
         """
-        Logs a single LLM interaction event to the 'usage_analytics' table.
-        This method is typically called from the LLMGateway immediately after
-        an API call is completed.
+        Records a single LLM interaction event for the 'usage_analytics' table.
+        This only enqueues the row (O(1), non-blocking); the background writer
+        thread performs the actual database write off the critical path.
 
         Args:
             user_id (int): The database ID of the user who triggered the LLM call.
@@ -58,18 +79,67 @@ class AnalyticsManager:
             response_time (float): The time in seconds it took to get the response
                                    from the moment the request was sent.
         """
+        self._q.put((user_id, model_name, response_time))
+        logger.info("Queued analytics: User ID=%s, Model='%s', Response Time=%.2fs",
+                    user_id, model_name, response_time)
+
+    def flush(self):
+        """
+        Blocks until every row queued so far has been written to the database.
+        Safe to call at any time.
+        """
+        if not self._writer_thread.is_alive():
+            return
+        done = threading.Event()
+        self._q.put(done)
+        done.wait(timeout=5)
+
+    def close(self):
+        """
+        Flushes all pending rows and stops the writer thread. Called
+        automatically at interpreter exit.
+        """
+        if not self._writer_thread.is_alive():
+            return
+        self._q.put(self._SENTINEL)
+        self._writer_thread.join(timeout=5)
+
+    def _writer(self):
+        """
+        The background writer loop. Collects rows from the queue into a batch
+        and writes it when the threshold is reached, the queue momentarily
+        drains, or a flush/shutdown is requested.
+        """
+        batch = []
+        while True:
+            item = self._q.get()
+            if item is self._SENTINEL:
+                self._write_batch(batch)
+                break
+            if isinstance(item, threading.Event):
+                # A flush request: persist everything buffered, then signal.
+                self._write_batch(batch)
+                batch = []
+                item.set()
+                continue
+            batch.append(item)
+            if len(batch) >= self._flush_threshold or self._q.empty():
+                self._write_batch(batch)
+                batch = []
+
+    def _write_batch(self, batch: list):
+        """
+        Writes one batch of analytics rows with a single commit (one fsync
+        instead of N).
+        """
+        if not batch:
+            return
         try:
-            # The query to insert a new row into the analytics table.
-            # We use placeholders (?) to prevent SQL injection vulnerabilities.
             query = "INSERT INTO usage_analytics (user_id, model_name, response_time) VALUES (?, ?, ?)"
-            params = (user_id, model_name, response_time)
-            
-            self.db_manager.execute_query(query, params)
-            
-            # Log the action to the console for real-time monitoring.
-            logger.info(f"Logged analytics: User ID={user_id}, Model='{model_name}', Response Time={response_time:.2f}s")
-            
+            self.db_manager.conn.executemany(query, batch)
+            self.db_manager.conn.commit()
+            logger.info("Wrote %d analytics row(s) to the database.", len(batch))
         except Exception as e:
             # If logging fails for any reason (e.g., database error), we don't want
             # it to crash the main application. We just log the error and move on.
-            logger.error(f"Failed to log usage analytics for user {user_id}: {e}")
\ No newline at end of file
+            logger.error("Failed to write usage analytics batch: %s", e)
\ No newline at end of file
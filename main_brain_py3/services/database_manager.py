@@ -1,16 +1,31 @@
 #
 # main_brain_py3/services/database_manager.py (UPDATED)
 #
+import hashlib
+import hmac
 import sqlite3
 import json
 import logging
+import threading
+import time
 import bcrypt
 
+import settings
+
 logger = logging.getLogger(__name__)
 
+# How long a successful PIN verification stays cached (seconds). Within this
+# window a re-authentication skips the deliberately slow bcrypt KDF.
+AUTH_CACHE_TTL = 300
+
 
-def hash_pin(pin: str) -> str:
-    return bcrypt.hashpw(pin.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+def hash_pin(pin: str, rounds: int = None) -> str:
+    """Hashes a PIN with bcrypt. The work factor defaults to
+    settings.BCRYPT_ROUNDS so deployments (e.g. batch user imports) can
+    tune the cost without touching call sites."""
+    if rounds is None:
+        rounds = settings.BCRYPT_ROUNDS
+    return bcrypt.hashpw(pin.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
 
 
 def check_pin(pin: str, hashed: str) -> bool:
@@ -23,25 +38,84 @@ def check_pin(pin: str, hashed: str) -> bool:
 class DatabaseManager:
     def __init__(self, db_path="tutor.db"):
         self.db_path = db_path
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        # One connection per thread instead of a single shared one. Sharing a
+        # connection serializes all threads on sqlite3's internal lock; with
+        # WAL, separate connections let the background analytics writer and
+        # the main thread proceed in parallel.
+        self._local = threading.local()
+        # Short-TTL cache of successful authentications, keyed on a fast
+        # keyed digest of the PIN. bcrypt costs tens of milliseconds by
+        # design; repeat auths within the TTL drop to a dict lookup.
+        self._auth_cache = {}
+        # Puzzles are immutable within a session, so cache them after the
+        # first fetch and skip the SQLite round-trip plus JSON decode.
+        self._puzzle_cache = {}
+        # Open the calling thread's connection eagerly so a bad path fails
+        # here rather than on first use.
+        self._get_conn()
         logger.info(f"Database connection established to {db_path}.")
 
+    def _get_conn(self):
+        """Returns this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # cached_statements bumps SQLite's internal prepared-statement
+            # cache so repeated queries (analytics inserts, puzzle lookups)
+            # skip re-parsing the SQL text on every call.
+            conn = sqlite3.connect(self.db_path, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            # Tune the connection for this workload. WAL lets readers and the
+            # background analytics writer proceed in parallel, and
+            # synchronous=NORMAL drops the full fsync per commit (WAL still
+            # guarantees consistency, at worst losing the last batch on power
+            # failure — acceptable for usage analytics).
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA cache_size=-20000")  # ~20 MB page cache
+            self._local.conn = conn
+            # A reusable per-thread cursor avoids allocating one per query.
+            self._local.cursor = conn.cursor()
+        return conn
+
+    @property
+    def conn(self):
+        """The calling thread's connection (kept for existing callers such
+        as the analytics writer)."""
+        return self._get_conn()
+
     def execute_query(self, query, params=(), fetch=None):
         try:
-            c = self.conn.cursor()
+            self._get_conn()
+            c = self._local.cursor
             c.execute(query, params)
             if fetch == 'one':
-                result = c.fetchone()
-                return dict(result) if result else None
+                # Return the sqlite3.Row directly: it already supports both
+                # index and key access, so copying it into a dict is O(columns)
+                # of pure overhead. Callers that need to mutate the row
+                # materialize a dict themselves.
+                return c.fetchone()
             elif fetch == 'all':
-                results = c.fetchall()
-                return [dict(row) for row in results]
+                return c.fetchall()
             else:
                 self.conn.commit()
                 return c.lastrowid
         except Exception as e:
-            logger.error(f"Database query failed: {e}", exc_info=True)
+            logger.error("Database query failed: %s", e, exc_info=True)
+            raise
+
+    def execute_query_iter(self, query, params=()):
+        """
+        Streaming variant of execute_query for large result sets (e.g.
+        analytics exports). Yields sqlite3.Row objects one at a time
+        directly from the cursor, so memory stays O(1) instead of
+        materializing the whole result list. Uses its own cursor so an
+        in-progress iteration is not clobbered by other queries.
+        """
+        try:
+            yield from self.conn.execute(query, params)
+        except Exception as e:
+            logger.error("Database query failed: %s", e, exc_info=True)
             raise
 
     def setup_tables(self):
@@ -65,6 +139,14 @@ class DatabaseManager:
                               response_time REAL, 
                               timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP, 
                               FOREIGN KEY(user_id) REFERENCES users(id))''')
+        # Indexes for the analytics rollup queries. Without them a per-user
+        # or per-model aggregation scans the whole table; with them it is an
+        # index seek. (users.username already has an implicit index from its
+        # UNIQUE constraint.)
+        self.execute_query('''CREATE INDEX IF NOT EXISTS idx_usage_user
+                              ON usage_analytics(user_id, timestamp DESC)''')
+        self.execute_query('''CREATE INDEX IF NOT EXISTS idx_usage_model
+                              ON usage_analytics(model_name)''')
         logger.info("Database tables created/verified.")
 
     def add_user(self, username, pin, profile_dict):
@@ -74,16 +156,82 @@ class DatabaseManager:
             self.execute_query(
                 "INSERT OR REPLACE INTO users (username, pin_hash, profile_json) VALUES (?, ?, ?)", (username, pin_hash, profile_json))
         except sqlite3.IntegrityError:
-            logger.warning(f"User '{username}' already exists.")
+            logger.warning("User '%s' already exists.", username)
 
     def authenticate_user(self, username, pin):
         user_row = self.execute_query(
             "SELECT * FROM users WHERE username = ?", (username,), fetch='one')
-        if user_row and check_pin(pin, user_row['pin_hash']):
-            user_row['profile'] = json.loads(user_row['profile_json'])
-            return user_row
+        if not user_row:
+            return None
+
+        # Build a fast keyed digest of the PIN. Keying with a slice of the
+        # stored bcrypt hash ties the cache entry to this user's current
+        # credentials, so a changed PIN invalidates old entries naturally.
+        digest = hashlib.blake2b(
+            pin.encode('utf-8'),
+            key=user_row['pin_hash'].encode('utf-8')[:16],
+            digest_size=16).hexdigest()
+        cache_key = (username, digest)
+
+        cached = self._auth_cache.get(cache_key)
+        if cached and cached[0] > time.monotonic():
+            logger.info("Authentication cache hit for '%s'.", username)
+            return cached[1]
+
+        if check_pin(pin, user_row['pin_hash']):
+            # Materialize a dict only here, where the row gains a decoded
+            # 'profile' field; everything upstream works on the raw Row.
+            user = dict(user_row)
+            user['profile'] = json.loads(user['profile_json'])
+            # Evict stale entries opportunistically so the cache stays small.
+            now = time.monotonic()
+            self._auth_cache = {
+                k: v for k, v in self._auth_cache.items() if v[0] > now}
+            self._auth_cache[cache_key] = (now + AUTH_CACHE_TTL, user)
+            return user
         return None
 
+    def issue_session_token(self, user_id: int, ttl: int = None) -> str:
+        """
+        Issues an HMAC-signed session token after a successful login.
+        Re-auth checks can then use authenticate_token, which costs one
+        constant-time HMAC compare instead of a full bcrypt verification.
+        """
+        if ttl is None:
+            ttl = settings.SESSION_TTL
+        expiry = int(time.time()) + ttl
+        payload = f"{user_id}:{expiry}"
+        signature = hmac.new(
+            settings.SESSION_KEY, payload.encode('utf-8'), 'sha256').hexdigest()
+        return f"{payload}:{signature}"
+
+    def authenticate_token(self, token: str):
+        """
+        Validates a session token. Returns the user row (with decoded
+        profile) on success, or None for a malformed, tampered, or expired
+        token. This is the fast re-auth path: no bcrypt involved.
+        """
+        try:
+            user_id_str, expiry_str, signature = token.rsplit(":", 2)
+            payload = f"{user_id_str}:{expiry_str}"
+            expected = hmac.new(
+                settings.SESSION_KEY, payload.encode('utf-8'), 'sha256').hexdigest()
+            # Constant-time compare to avoid leaking signature prefixes.
+            if not hmac.compare_digest(signature, expected):
+                return None
+            if int(expiry_str) < time.time():
+                return None
+        except (ValueError, AttributeError):
+            return None
+
+        user_row = self.execute_query(
+            "SELECT * FROM users WHERE id = ?", (int(user_id_str),), fetch='one')
+        if not user_row:
+            return None
+        user = dict(user_row)
+        user['profile'] = json.loads(user['profile_json'])
+        return user
+
     # --- NEW METHODS TO ADD ---
 
     def add_puzzle(self, puzzle_id: str, question: str, image_url: str, solution_keywords: list):
@@ -94,15 +242,60 @@ class DatabaseManager:
                 "INSERT OR REPLACE INTO puzzles (puzzle_id, question, image_url, solution_keywords_json) VALUES (?, ?, ?, ?)",
                 (puzzle_id, question, image_url, keywords_json)
             )
+            # Drop any cached copy so the next get_puzzle sees the update.
+            self._puzzle_cache.pop(puzzle_id, None)
         except Exception as e:
-            logger.error(f"Failed to add puzzle {puzzle_id} to database: {e}")
+            logger.error("Failed to add puzzle %s to database: %s", puzzle_id, e)
+
+    def get_puzzles(self, puzzle_ids: list) -> dict:
+        """
+        Retrieves several puzzles in one round-trip using a single
+        SELECT ... WHERE puzzle_id IN (...) query, instead of one query per
+        puzzle. Fetched rows are decoded once and populate the puzzle cache.
+
+        Returns:
+            dict: A mapping of puzzle_id -> puzzle dict (missing IDs are
+                  simply absent).
+        """
+        puzzles = {}
+        missing = []
+        for puzzle_id in puzzle_ids:
+            cached = self._puzzle_cache.get(puzzle_id)
+            if cached is not None:
+                puzzles[puzzle_id] = cached
+            else:
+                missing.append(puzzle_id)
+
+        if missing:
+            placeholders = ",".join("?" * len(missing))
+            rows = self.execute_query(
+                f"SELECT * FROM puzzles WHERE puzzle_id IN ({placeholders})",
+                tuple(missing), fetch='all')
+            for row in rows:
+                puzzle = dict(row)
+                puzzle['solution_keywords'] = frozenset(
+                    k.lower() for k in json.loads(puzzle['solution_keywords_json']))
+                self._puzzle_cache[puzzle['puzzle_id']] = puzzle
+                puzzles[puzzle['puzzle_id']] = puzzle
+
+        return puzzles
 
     def get_puzzle(self, puzzle_id: str) -> dict:
-        """Retrieves a single puzzle's metadata from the database by its ID."""
+        """Retrieves a single puzzle's metadata, using the in-memory cache
+        after the first lookup."""
+        cached = self._puzzle_cache.get(puzzle_id)
+        if cached is not None:
+            return cached
         puzzle_row = self.execute_query(
             "SELECT * FROM puzzles WHERE puzzle_id = ?", (puzzle_id,), fetch='one')
         if puzzle_row:
-            # Convert the solution keywords from a JSON string back into a Python list
-            puzzle_row['solution_keywords'] = json.loads(
-                puzzle_row['solution_keywords_json'])
+            # Materialize a dict so we can attach the decoded keywords.
+            puzzle_row = dict(puzzle_row)
+            # Decode the solution keywords and store them pre-lowercased in a
+            # frozenset, so the answer check in the interaction loop is a
+            # single O(1) membership test instead of lowercasing and scanning
+            # a list on every turn.
+            puzzle_row['solution_keywords'] = frozenset(
+                k.lower() for k in json.loads(puzzle_row['solution_keywords_json']))
+            self._puzzle_cache[puzzle_id] = puzzle_row
         return puzzle_row
@@ -19,6 +19,7 @@
 # ==============================================================================
 
 import logging
+import threading
 import settings  # Imports configuration from your new settings.py file
 
 # --- LangChain Core Imports ---
@@ -35,6 +36,70 @@ from .llm_gateway import LLMGateway
 logger = logging.getLogger(__name__)
 
 
+# This is the master prompt template. It contains placeholders for all the
+# dynamic information we will provide. This is the heart of "prompt engineering."
+# It is a constant, so it is compiled exactly once at module load instead of
+# being re-parsed on every hint request.
+_HINT_TEMPLATE = """
+You are Pepper, a helpful and friendly robot tutor. Your personality MUST adapt to the user you are talking to.
+
+**Your Current User's Profile:**
+Your current user is {user_name}, aged {user_age}. You must speak to them as if you are {user_persona}.
+
+**The Current Puzzle:**
+The user is trying to solve this riddle: "{puzzle_question}"
+
+**Retrieved Context from Memory:**
+Based on the user's input, here is the most relevant information I found about this puzzle in my memory banks:
+---
+{context}
+---
+
+**The User's Recent Input:**
+The user just said: "{user_input}"
+
+**Your Task:**
+Based on ALL of the information above, your goal is to provide a single, short, and helpful hint.
+- **Adhere to the User's Persona:** Your tone and style must match the user's profile.
+- **Do NOT give away the final answer.** Guide them, don't solve it for them.
+- **Be Concise:** Keep your response to 1-3 sentences.
+- **Be Conversational:** Phrase your response as if you are speaking directly to the user.
+"""
+
+_HINT_PROMPT = ChatPromptTemplate.from_template(_HINT_TEMPLATE)
+
+
+class _CachedQueryEmbeddings:
+    """
+    A thin wrapper around an embeddings model that memoizes embed_query
+    results keyed on the normalized input text. Tutor sessions repeat the
+    same short inputs constantly ("hint", "help", common guesses), and each
+    repeat would otherwise cost a full OpenAI embedding API round-trip
+    (~100-300 ms) plus tokens. Document embedding passes straight through.
+    """
+
+    def __init__(self, inner, maxsize: int = 256):
+        self._inner = inner
+        self._maxsize = maxsize
+        self._cache = {}
+
+    def embed_query(self, text: str):
+        key = text.lower().strip()
+        vector = self._cache.get(key)
+        if vector is None:
+            vector = self._inner.embed_query(text)
+            if len(self._cache) >= self._maxsize:
+                # Drop the oldest entry (dicts preserve insertion order).
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = vector
+        else:
+            logger.info("Embedding cache hit for query input.")
+        return vector
+
+    def embed_documents(self, texts):
+        return self._inner.embed_documents(texts)
+
+
 class LangChainOrchestrator:
     """
     Orchestrates the RAG process to generate context-aware and personalized hints.
@@ -42,35 +107,77 @@ class LangChainOrchestrator:
 
     def __init__(self, llm_gateway: LLMGateway):
         """
-        Initializes the orchestrator by loading the vector store and setting up the retriever.
+        Initializes the orchestrator. The FAISS vector store is NOT loaded
+        here: deserializing the whole index costs noticeable time, and a user
+        who quits or never asks for a hint would pay it for nothing. Loading
+        is deferred to the first generate_hint call via _ensure_retriever.
 
         Args:
             llm_gateway (LLMGateway): An initialized instance of the LLMGateway.
         """
         self.llm_gateway = llm_gateway
+        self._retriever = None
+        # The RAG chain's composition is static, so it is assembled once
+        # (alongside the retriever) rather than per generate_hint call.
+        self._rag_chain = None
+        # Guards the lazy load in case generate_hint is ever called from
+        # more than one thread.
+        self._retriever_lock = threading.Lock()
+        logger.info(
+            "LangChain Orchestrator initialized (vector store will load on first hint).")
 
-        try:
-            logger.info("Initializing LangChain Orchestrator...")
-            # Use OpenAI embeddings, which are reliable and a standard choice for RAG.
-            # This must match the embeddings used in the setup_environment.py script.
-            embeddings = OpenAIEmbeddings(api_key=settings.API_KEYS["openai"])
-
-            # Load the pre-built FAISS vector store from the local directory.
-            vector_store = FAISS.load_local(
-                "vector_store", embeddings, allow_dangerous_deserialization=True)
-
-            # Create a "retriever" from the vector store. The retriever is an object
-            # that can efficiently search for the most relevant documents.
-            self.retriever = vector_store.as_retriever()
-
-            logger.info(
-                "LangChain Orchestrator: FAISS vector store loaded successfully.")
-
-        except Exception as e:
-            logger.critical(
-                f"FATAL: Failed to load vector store. Did you run setup_environment.py successfully? Error: {e}", exc_info=True)
-            # This is a critical error; the application cannot function without the vector store.
-            raise
+    def _ensure_retriever(self):
+        """
+        Loads the FAISS vector store and builds the retriever on first use.
+        Subsequent calls are a cheap attribute check.
+        """
+        if self._retriever is not None:
+            return
+        with self._retriever_lock:
+            if self._retriever is not None:
+                return
+            try:
+                logger.info("Loading FAISS vector store (first hint request)...")
+                # Use OpenAI embeddings, which are reliable and a standard choice for RAG.
+                # This must match the embeddings used in the setup_environment.py script.
+                # The cache wrapper skips the embedding API call entirely for
+                # repeated user inputs.
+                embeddings = _CachedQueryEmbeddings(
+                    OpenAIEmbeddings(api_key=settings.API_KEYS["openai"]))
+
+                # Load the pre-built FAISS vector store from the local directory.
+                vector_store = FAISS.load_local(
+                    "vector_store", embeddings, allow_dangerous_deserialization=True)
+
+                # Create a "retriever" from the vector store. The retriever is an object
+                # that can efficiently search for the most relevant documents.
+                self._retriever = vector_store.as_retriever()
+
+                # Assemble the RAG chain once. Only invoke() varies per call.
+                # It's read from top to bottom.
+                self._rag_chain = (
+                    {
+                        # The 'context' is filled by running the user's input through our retriever.
+                        "context": self._retriever,
+                        # 'user_input' is passed through directly from the input.
+                        "user_input": RunnablePassthrough(),
+                    }
+                    # The retrieved context and user input are fed into our prompt template.
+                    | _HINT_PROMPT
+                    # The filled prompt is sent to our LLM gateway.
+                    | (lambda p: self.llm_gateway.query(settings.LLM_FOR_HINTS, p.to_string(), settings.MAX_TOKENS_FOR_HINT))
+                    # The final output from the LLM is cleaned up into a simple string.
+                    | StrOutputParser()
+                )
+
+                logger.info(
+                    "LangChain Orchestrator: FAISS vector store loaded successfully.")
+
+            except Exception as e:
+                logger.critical(
+                    f"FATAL: Failed to load vector store. Did you run setup_environment.py successfully? Error: {e}", exc_info=True)
+                # This is a critical error; the application cannot function without the vector store.
+                raise
 
     def generate_hint(self, puzzle: dict, user_input: str, user_profile: dict) -> str:
         """
@@ -84,60 +191,16 @@ class LangChainOrchestrator:
         Returns:
             str: The AI-generated hint.
         """
+        # Make sure the vector store is loaded (no-op after the first call).
+        self._ensure_retriever()
+
         logger.info(
             f"Generating hint for user '{user_profile.get('name')}' on puzzle '{puzzle.get('puzzle_id')}'")
 
-        # This is the master prompt template. It contains placeholders for all the
-        # dynamic information we will provide. This is the heart of "prompt engineering."
-        template = """
-        You are Pepper, a helpful and friendly robot tutor. Your personality MUST adapt to the user you are talking to.
-        
-        **Your Current User's Profile:**
-        Your current user is {user_name}, aged {user_age}. You must speak to them as if you are {user_persona}.
-
-        **The Current Puzzle:**
-        The user is trying to solve this riddle: "{puzzle_question}"
-
-        **Retrieved Context from Memory:**
-        Based on the user's input, here is the most relevant information I found about this puzzle in my memory banks:
-        ---
-        {context}
-        ---
-
-        **The User's Recent Input:**
-        The user just said: "{user_input}"
-
-        **Your Task:**
-        Based on ALL of the information above, your goal is to provide a single, short, and helpful hint.
-        - **Adhere to the User's Persona:** Your tone and style must match the user's profile.
-        - **Do NOT give away the final answer.** Guide them, don't solve it for them.
-        - **Be Concise:** Keep your response to 1-3 sentences.
-        - **Be Conversational:** Phrase your response as if you are speaking directly to the user.
-        """
-
-        prompt_template = ChatPromptTemplate.from_template(template)
-
-        # This chain defines the sequence of operations for the RAG process.
-        # It's read from top to bottom.
-        rag_chain = (
-            {
-                # The 'context' is filled by running the user's input through our retriever.
-                "context": self.retriever,
-                # 'user_input' is passed through directly from the input.
-                "user_input": RunnablePassthrough(),
-            }
-            # The retrieved context and user input are fed into our prompt template.
-            | prompt_template
-            # The filled prompt is sent to our LLM gateway.
-            | (lambda p: self.llm_gateway.query(settings.LLM_FOR_HINTS, p.to_string(), settings.MAX_TOKENS_FOR_HINT))
-            # The final output from the LLM is cleaned up into a simple string.
-            | StrOutputParser()
-        )
-
         # We invoke the chain by passing the user's input. LangChain automatically
         # uses this input for any part of the chain that needs it (like the retriever).
         # We also pass the user and puzzle info which the prompt template will use.
-        response = rag_chain.invoke(
+        response = self._rag_chain.invoke(
             user_input,
             config={
                 "configurable": {
@@ -10,17 +10,92 @@
 #  of the calling function (the main_controller).
 # ==============================================================================
 
+import asyncio
+import functools
+import hashlib
+import io
+import itertools
+import json
 import logging
+import random
+import time
 import settings  # Imports configuration from your new settings.py file
 
 # Import the specific client libraries for each LLM provider
-from openai import OpenAI
-from anthropic import Anthropic
+import httpx
+import openai
+import anthropic
+from openai import OpenAI, AsyncOpenAI
+from anthropic import Anthropic, AsyncAnthropic
 import google.generativeai as genai
 
 # Set up a logger for this module
 logger = logging.getLogger(__name__)
 
+# Errors worth retrying: rate limits and connection/timeout hiccups clear
+# up on their own within seconds. Anything else (auth, bad request) would
+# just fail again identically.
+TRANSIENT_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    anthropic.RateLimitError,
+    anthropic.APIConnectionError,
+    anthropic.APITimeoutError,
+    httpx.TransportError,
+    httpx.TimeoutException,
+)
+
+# Retry/backoff tuning: up to 4 attempts with randomized exponential
+# backoff capped at 8 s, so a transient 429 costs a short pause instead of
+# a user-visible apology.
+RETRY_ATTEMPTS = 4
+RETRY_BACKOFF_MIN = 0.5  # seconds
+RETRY_BACKOFF_MAX = 8.0  # seconds
+
+# Circuit breaker: after this many consecutive failures for one provider,
+# stop dialing it for the reset window and serve the fallback immediately,
+# keeping tail latency bounded during an outage.
+BREAKER_FAIL_MAX = 5
+BREAKER_RESET_TIMEOUT = 30  # seconds
+
+# Response cache tuning. A provider call costs seconds; a cache hit costs a
+# dict lookup. Hints repeat heavily across sessions (same puzzles, same
+# profiles, same common inputs), so even an exact-match cache pays off.
+RESPONSE_CACHE_TTL = 3600  # seconds
+RESPONSE_CACHE_MAXSIZE = 1024
+
+# The canned apology returned when a provider call fails. Kept in one place
+# so cache logic can recognize (and never cache) it.
+FALLBACK_RESPONSE = "I'm sorry, I'm having a little trouble thinking right now. Could you ask me again?"
+
+
+def iter_sentences(chunks):
+    """
+    Regroups a stream of text chunks (e.g. from LLMGateway.stream_query)
+    into complete sentences, yielding each one as soon as its terminator
+    arrives. This lets a caller start robot.say() on the first sentence
+    while the model is still generating the rest.
+    """
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        while True:
+            cut = -1
+            for terminator in (". ", "! ", "? ", ".\n", "!\n", "?\n"):
+                idx = buffer.find(terminator)
+                if idx != -1 and (cut == -1 or idx < cut):
+                    cut = idx
+            if cut == -1:
+                break
+            sentence = buffer[:cut + 1].strip()
+            buffer = buffer[cut + 2:]
+            if sentence:
+                yield sentence
+    tail = buffer.strip()
+    if tail:
+        yield tail
+
 
 class LLMGateway:
     """
@@ -29,36 +104,393 @@ class LLMGateway:
 
     def __init__(self):
         """
-        Initializes the gateway by configuring all the necessary API clients
-        using the centrally loaded settings.
+        Initializes the gateway. All provider clients are created lazily via
+        cached_property, so a session that only ever routes to one provider
+        never pays client construction (and TLS context setup) for the other
+        three.
         """
-        logger.info("Initializing LLM Gateway clients...")
+        # Exact-match response cache: key -> (expiry, response text).
+        # Insertion order doubles as the eviction order.
+        self._response_cache = {}
+
+        # Buffer of non-interactive prompts destined for the OpenAI Batch
+        # API (half-price, 24 h SLA) instead of the online endpoint.
+        self._batch_buffer = []
+
+        # Per-provider circuit-breaker state:
+        # prefix -> [consecutive failures, monotonic time the breaker opened].
+        self._breaker = {}
+
+        logger.info("LLM Gateway initialized (clients created lazily on first use).")
 
-        # --- Configure OpenAI Client (for GPT models) ---
-        self.openai_client = OpenAI(
-            api_key=settings.API_KEYS.get("openai")
+    # --- Shared HTTP pools (lazy) ---
+    # Without these, every client builds its own internal httpx pool and
+    # pays its own cold TCP+TLS handshake. One shared client per flavor
+    # (sync/async) keeps connections alive and reuses them across providers.
+
+    @functools.cached_property
+    def _sync_http(self):
+        return httpx.Client(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=40,
+                keepalive_expiry=30.0,
+            ),
         )
 
-        # --- Configure Anthropic Client (for Claude models) ---
-        self.anthropic_client = Anthropic(
-            api_key=settings.API_KEYS.get("anthropic")
+    @functools.cached_property
+    def _async_http(self):
+        # Bound to the first event loop it runs on; see aquery() for the
+        # single-long-lived-loop requirement this implies.
+        return httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=40,
+                keepalive_expiry=30,
+            ),
         )
 
-        # --- Configure Google Client (for Gemini models) ---
+    # --- Provider clients (lazy) ---
+    # query()/aquery() only touch the one property their routing selects, so
+    # clients are constructed only for providers actually used.
+    #
+    # settings.API_KEYS may hold a single key or a list of keys per
+    # provider. With a list, one client is built per key and the
+    # *_client properties rotate through them round-robin, so rate limits
+    # are spread across keys and a single-key 429 no longer stalls the
+    # tutor. All clients share the pooled HTTP transport.
+
+    @staticmethod
+    def _keys_for(provider: str) -> list:
+        keys = settings.API_KEYS.get(provider)
+        if isinstance(keys, (list, tuple)):
+            return list(keys)
+        return [keys]
+
+    @functools.cached_property
+    def _openai_cycle(self):
+        return itertools.cycle([
+            OpenAI(api_key=key, http_client=self._sync_http)
+            for key in self._keys_for("openai")
+        ])
+
+    @property
+    def openai_client(self):
+        return next(self._openai_cycle)
+
+    @functools.cached_property
+    def _anthropic_cycle(self):
+        return itertools.cycle([
+            Anthropic(api_key=key, http_client=self._sync_http)
+            for key in self._keys_for("anthropic")
+        ])
+
+    @property
+    def anthropic_client(self):
+        return next(self._anthropic_cycle)
+
+    @functools.cached_property
+    def _genai_ready(self):
+        # genai configures its key process-wide, so Gemini cannot rotate
+        # keys per call; the first configured key is used.
         try:
-            genai.configure(api_key=settings.API_KEYS.get("google"))
-            self.google_model = genai.GenerativeModel('gemini-pro')
+            genai.configure(api_key=self._keys_for("google")[0])
+            return True
         except Exception as e:
             logger.error(f"Failed to configure Google Gemini client: {e}")
-            self.google_model = None
+            return False
+
+    @functools.lru_cache(maxsize=8)
+    def _gemini_model(self, model_name: str):
+        """
+        One GenerativeModel per unique model name, built on first use and
+        reused thereafter, so the SDK's per-model setup is not repeated on
+        every call. The gateway is a long-lived singleton, so caching on
+        the bound method is fine.
+        """
+        return genai.GenerativeModel(model_name)
+
+    @property
+    def google_model(self):
+        """The default Gemini model, kept for existing callers."""
+        if not self._genai_ready:
+            return None
+        return self._gemini_model('gemini-pro')
+
+    @functools.cached_property
+    def _deepseek_cycle(self):
+        return itertools.cycle([
+            OpenAI(api_key=key,
+                   base_url="https://api.deepseek.com/v1",
+                   http_client=self._sync_http)
+            for key in self._keys_for("deepseek")
+        ])
+
+    @property
+    def deepseek_client(self):
+        return next(self._deepseek_cycle)
+
+    @functools.cached_property
+    def _async_openai_cycle(self):
+        return itertools.cycle([
+            AsyncOpenAI(api_key=key, http_client=self._async_http)
+            for key in self._keys_for("openai")
+        ])
+
+    @property
+    def async_openai_client(self):
+        return next(self._async_openai_cycle)
+
+    @functools.cached_property
+    def _async_anthropic_cycle(self):
+        return itertools.cycle([
+            AsyncAnthropic(api_key=key, http_client=self._async_http)
+            for key in self._keys_for("anthropic")
+        ])
+
+    @property
+    def async_anthropic_client(self):
+        return next(self._async_anthropic_cycle)
+
+    @functools.cached_property
+    def _async_deepseek_cycle(self):
+        return itertools.cycle([
+            AsyncOpenAI(api_key=key,
+                        base_url="https://api.deepseek.com/v1",
+                        http_client=self._async_http)
+            for key in self._keys_for("deepseek")
+        ])
 
-        # --- Configure DeepSeek Client ---
-        self.deepseek_client = OpenAI(
-            api_key=settings.API_KEYS.get("deepseek"),
-            base_url="https://api.deepseek.com/v1"
+    @property
+    def async_deepseek_client(self):
+        return next(self._async_deepseek_cycle)
+
+    def prewarm(self):
+        """
+        Optionally pre-establishes TCP+TLS connections to the providers so
+        the first real query() skips the ~100-300 ms handshake. Call this
+        during an idle moment (e.g., while the robot greets the user); it is
+        deliberately not run in __init__ to keep construction network-free.
+        """
+        for url in ("https://api.openai.com/v1",
+                    "https://api.anthropic.com",
+                    "https://api.deepseek.com/v1"):
+            try:
+                self._sync_http.head(url, timeout=3.0)
+            except Exception as e:
+                # Any response (even 4xx) has already warmed the connection;
+                # only log genuine transport failures.
+                logger.debug("Pre-warm request to %s failed: %s", url, e)
+
+    @staticmethod
+    def _cache_key(model_name: str, prompt: str, max_tokens: int) -> str:
+        """A stable key covering everything that determines the response."""
+        payload = f"{model_name}\x00{max_tokens}\x00{prompt}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _cache_get(self, key: str):
+        """Returns the cached response text, or None on miss/expiry."""
+        entry = self._response_cache.get(key)
+        if entry is None:
+            return None
+        expiry, text = entry
+        if expiry < time.monotonic():
+            del self._response_cache[key]
+            return None
+        return text
+
+    def _cache_put(self, key: str, text: str):
+        """Stores a successful response; never caches the fallback apology."""
+        if not text or text == FALLBACK_RESPONSE:
+            return
+        if len(self._response_cache) >= RESPONSE_CACHE_MAXSIZE:
+            # Evict the oldest entry (dicts preserve insertion order).
+            self._response_cache.pop(next(iter(self._response_cache)))
+        self._response_cache[key] = (
+            time.monotonic() + RESPONSE_CACHE_TTL, text)
+
+    # --- Per-provider call methods ---
+    # Routing happens through the dispatch tables below: one dict lookup on
+    # the model-name prefix instead of four substring scans with an
+    # unpredictable branch per query.
+
+    def _call_openai(self, model_name, prompt, max_tokens):
+        response = self.openai_client.chat.completions.create(
+            model=model_name,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}]
         )
+        return response.choices[0].message.content
 
-        logger.info("LLM Gateway initialized successfully.")
+    def _call_anthropic(self, model_name, prompt, max_tokens):
+        response = self.anthropic_client.messages.create(
+            model=model_name,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return response.content[0].text
+
+    def _call_gemini(self, model_name, prompt, max_tokens):
+        if not self._genai_ready:
+            raise ConnectionError("Google Gemini client is not configured.")
+        model = self._gemini_model(model_name)
+        # generation_config caps the output; previously max_tokens was
+        # silently ignored for Gemini.
+        response = model.generate_content(
+            prompt, generation_config={"max_output_tokens": max_tokens})
+        return response.text
+
+    def _call_deepseek(self, model_name, prompt, max_tokens):
+        response = self.deepseek_client.chat.completions.create(
+            model=model_name,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return response.choices[0].message.content
+
+    async def _acall_openai(self, model_name, prompt, max_tokens):
+        response = await self.async_openai_client.chat.completions.create(
+            model=model_name,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return response.choices[0].message.content
+
+    async def _acall_anthropic(self, model_name, prompt, max_tokens):
+        response = await self.async_anthropic_client.messages.create(
+            model=model_name,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return response.content[0].text
+
+    async def _acall_gemini(self, model_name, prompt, max_tokens):
+        if not self._genai_ready:
+            raise ConnectionError("Google Gemini client is not configured.")
+        model = self._gemini_model(model_name)
+        # The genai SDK has no shared-pool async client; run its
+        # blocking call in the default executor so the loop stays free.
+        response = await asyncio.get_running_loop().run_in_executor(
+            None,
+            functools.partial(model.generate_content, prompt,
+                              generation_config={"max_output_tokens": max_tokens}))
+        return response.text
+
+    async def _acall_deepseek(self, model_name, prompt, max_tokens):
+        response = await self.async_deepseek_client.chat.completions.create(
+            model=model_name,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return response.choices[0].message.content
+
+    @functools.cached_property
+    def _dispatch(self):
+        return {
+            "gpt": self._call_openai,
+            "claude": self._call_anthropic,
+            "gemini": self._call_gemini,
+            "deepseek": self._call_deepseek,
+        }
+
+    @functools.cached_property
+    def _adispatch(self):
+        return {
+            "gpt": self._acall_openai,
+            "claude": self._acall_anthropic,
+            "gemini": self._acall_gemini,
+            "deepseek": self._acall_deepseek,
+        }
+
+    @staticmethod
+    def _model_prefix(model_name: str) -> str:
+        """'gpt-4o' -> 'gpt', 'claude-3-haiku-...' -> 'claude', etc."""
+        return model_name.split("-", 1)[0]
+
+    # --- Retry + circuit breaker ---
+    # Transient provider errors are retried with randomized exponential
+    # backoff; sustained failure trips a per-provider breaker so an outage
+    # costs one fast fallback instead of 4 timed-out attempts per query.
+
+    def _breaker_allows(self, prefix: str) -> bool:
+        state = self._breaker.get(prefix)
+        if state is None or state[1] is None:
+            return True
+        if time.monotonic() - state[1] >= BREAKER_RESET_TIMEOUT:
+            # Half-open: let one probe request through.
+            state[1] = None
+            return True
+        return False
+
+    def _breaker_record(self, prefix: str, success: bool):
+        if success:
+            self._breaker.pop(prefix, None)
+            return
+        state = self._breaker.setdefault(prefix, [0, None])
+        state[0] += 1
+        if state[0] >= BREAKER_FAIL_MAX and state[1] is None:
+            state[1] = time.monotonic()
+            logger.warning(
+                "Circuit breaker opened for provider '%s' after %d "
+                "consecutive failures (reset in %ds).",
+                prefix, state[0], BREAKER_RESET_TIMEOUT)
+
+    @staticmethod
+    def _backoff_delay(attempt: int) -> float:
+        return random.uniform(
+            0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_MIN * (2 ** attempt)))
+
+    def _call_with_retries(self, handler, model_name, prompt, max_tokens):
+        prefix = self._model_prefix(model_name)
+        if not self._breaker_allows(prefix):
+            raise ConnectionError(
+                f"Circuit breaker open for provider '{prefix}'.")
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                result = handler(model_name, prompt, max_tokens)
+            except TRANSIENT_ERRORS as e:
+                self._breaker_record(prefix, success=False)
+                if attempt == RETRY_ATTEMPTS - 1 or not self._breaker_allows(prefix):
+                    raise
+                delay = self._backoff_delay(attempt)
+                logger.warning(
+                    "Transient error from '%s' (%s); retrying in %.1fs "
+                    "(attempt %d/%d).",
+                    model_name, e, delay, attempt + 1, RETRY_ATTEMPTS)
+                time.sleep(delay)
+            except Exception:
+                self._breaker_record(prefix, success=False)
+                raise
+            else:
+                self._breaker_record(prefix, success=True)
+                return result
+
+    async def _acall_with_retries(self, handler, model_name, prompt, max_tokens):
+        prefix = self._model_prefix(model_name)
+        if not self._breaker_allows(prefix):
+            raise ConnectionError(
+                f"Circuit breaker open for provider '{prefix}'.")
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                result = await handler(model_name, prompt, max_tokens)
+            except TRANSIENT_ERRORS as e:
+                self._breaker_record(prefix, success=False)
+                if attempt == RETRY_ATTEMPTS - 1 or not self._breaker_allows(prefix):
+                    raise
+                delay = self._backoff_delay(attempt)
+                logger.warning(
+                    "Transient error from '%s' (%s); retrying in %.1fs "
+                    "(attempt %d/%d).",
+                    model_name, e, delay, attempt + 1, RETRY_ATTEMPTS)
+                await asyncio.sleep(delay)
+            except Exception:
+                self._breaker_record(prefix, success=False)
+                raise
+            else:
+                self._breaker_record(prefix, success=True)
+                return result
 
     def query(self, model_name: str, prompt: str, max_tokens: int) -> str:
         """
@@ -73,48 +505,225 @@ class LLMGateway:
         Returns:
             str: The text content of the LLM's response.
         """
+        cache_key = self._cache_key(model_name, prompt, max_tokens)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            logger.info(f"Response cache hit for model: {model_name}")
+            return cached
+
         logger.info(f"--- Sending query to model: {model_name} ---")
         response_text = ""
 
         try:
-            # --- Model Routing Logic ---
-            if "gpt" in model_name:
-                response = self.openai_client.chat.completions.create(
-                    model=model_name,
-                    max_tokens=max_tokens,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                response_text = response.choices[0].message.content
-
-            elif "claude" in model_name:
-                response = self.anthropic_client.messages.create(
-                    model=model_name,
-                    max_tokens=max_tokens,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                response_text = response.content[0].text
-
-            elif "gemini" in model_name:
-                if not self.google_model:
-                    raise ConnectionError(
-                        "Google Gemini client is not configured.")
-                response = self.google_model.generate_content(prompt)
-                response_text = response.text
-
-            elif "deepseek" in model_name:
-                response = self.deepseek_client.chat.completions.create(
-                    model=model_name,
-                    max_tokens=max_tokens,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                response_text = response.choices[0].message.content
-
-            else:
+            handler = self._dispatch.get(self._model_prefix(model_name))
+            if handler is None:
                 raise ValueError(
                     f"Unsupported or unknown model name: {model_name}")
+            response_text = self._call_with_retries(
+                handler, model_name, prompt, max_tokens)
 
         except Exception as e:
             logger.error(f"API call to model '{model_name}' failed: {e}")
-            response_text = "I'm sorry, I'm having a little trouble thinking right now. Could you ask me again?"
+            response_text = FALLBACK_RESPONSE
+
+        response_text = response_text.strip()
+        self._cache_put(cache_key, response_text)
+        return response_text
+
+    async def aquery(self, model_name: str, prompt: str, max_tokens: int) -> str:
+        """
+        Async counterpart of query(). Awaiting this instead of calling the
+        sync version lets callers overlap several LLM calls (or an LLM call
+        with robot I/O) on one event loop, multiplexed over the shared
+        HTTP/2 pool.
+
+        All async use of one gateway instance must happen on a single
+        long-lived event loop: the shared AsyncClient binds to the first
+        loop it runs on, so repeated asyncio.run() calls would leave its
+        connections attached to a closed loop. Sync callers should stick
+        to query().
+
+        Args:
+            model_name (str): The specific model to use.
+            prompt (str): The full prompt to send to the model.
+            max_tokens (int): The maximum number of tokens for the response.
+
+        Returns:
+            str: The text content of the LLM's response.
+        """
+        cache_key = self._cache_key(model_name, prompt, max_tokens)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            logger.info(f"Response cache hit for model: {model_name}")
+            return cached
+
+        logger.info(f"--- Sending async query to model: {model_name} ---")
+        response_text = ""
+
+        try:
+            handler = self._adispatch.get(self._model_prefix(model_name))
+            if handler is None:
+                raise ValueError(
+                    f"Unsupported or unknown model name: {model_name}")
+            response_text = await self._acall_with_retries(
+                handler, model_name, prompt, max_tokens)
+
+        except Exception as e:
+            logger.error(f"Async API call to model '{model_name}' failed: {e}")
+            response_text = FALLBACK_RESPONSE
+
+        response_text = response_text.strip()
+        self._cache_put(cache_key, response_text)
+        return response_text
+
+    def stream_query(self, model_name: str, prompt: str, max_tokens: int):
+        """
+        Streaming variant of query(): yields response text incrementally as
+        the model generates it, instead of blocking for the full completion.
+
+        For hints spoken aloud, perceived latency is dominated by
+        time-to-first-token (a few hundred ms) rather than full-response
+        time (several seconds), and only one chunk is ever held in memory.
+        Pair with iter_sentences() to feed RobotProxy.say complete sentences
+        while later ones are still being generated.
 
-        return response_text.strip()
+        Only chat-completions providers (OpenAI, DeepSeek) support this
+        path; other models fall back to yielding the full query() response
+        in one piece. Streamed responses bypass the response cache, since
+        the caller consumes them before the full text exists.
+        """
+        prefix = self._model_prefix(model_name)
+        if prefix == "gpt":
+            client = self.openai_client
+        elif prefix == "deepseek":
+            client = self.deepseek_client
+        else:
+            yield self.query(model_name, prompt, max_tokens)
+            return
+
+        logger.info(f"--- Streaming query to model: {model_name} ---")
+        try:
+            stream = client.chat.completions.create(
+                model=model_name,
+                max_tokens=max_tokens,
+                messages=[{"role": "user", "content": prompt}],
+                stream=True
+            )
+            for chunk in stream:
+                yield chunk.choices[0].delta.content or ""
+        except Exception as e:
+            logger.error(
+                f"Streaming API call to model '{model_name}' failed: {e}")
+            yield FALLBACK_RESPONSE
+
+    # --- OpenAI Batch API path for non-interactive work ---
+    # Precomputing hints for a whole puzzle set does not need online
+    # latency; the Batch API charges half the token price in exchange for a
+    # 24-hour completion window. Interactive callers keep using query().
+
+    def queue_query(self, model_name: str, prompt: str, max_tokens: int,
+                    custom_id: str = None) -> str:
+        """
+        Buffers a non-interactive prompt for later batch submission.
+
+        Returns:
+            str: The custom_id that will identify this prompt in the
+                 batch results.
+        """
+        if custom_id is None:
+            custom_id = f"req-{len(self._batch_buffer)}-{self._cache_key(model_name, prompt, max_tokens)[:12]}"
+        self._batch_buffer.append({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": model_name,
+                "max_tokens": max_tokens,
+                "messages": [{"role": "user", "content": prompt}],
+            },
+        })
+        return custom_id
+
+    def submit_batch(self):
+        """
+        Uploads all queued prompts as a JSONL file and creates an OpenAI
+        batch job. Returns the batch ID to poll with get_batch_results, or
+        None when nothing is queued.
+        """
+        if not self._batch_buffer:
+            return None
+        jsonl = "\n".join(json.dumps(item) for item in self._batch_buffer)
+        batch_file = self.openai_client.files.create(
+            file=io.BytesIO(jsonl.encode('utf-8')),
+            purpose="batch",
+        )
+        batch = self.openai_client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        logger.info(
+            "Submitted batch %s with %d request(s).", batch.id, len(self._batch_buffer))
+        self._batch_buffer = []
+        return batch.id
+
+    def get_batch_results(self, batch_id: str):
+        """
+        Polls a batch job once. Returns {custom_id: response_text} when the
+        job has completed, or None while it is still running.
+        """
+        batch = self.openai_client.batches.retrieve(batch_id)
+        if batch.status != "completed":
+            logger.info("Batch %s status: %s", batch_id, batch.status)
+            return None
+        output = self.openai_client.files.content(batch.output_file_id)
+        results = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            body = record.get("response", {}).get("body", {})
+            choices = body.get("choices") or []
+            if choices:
+                results[record["custom_id"]] = \
+                    choices[0]["message"]["content"].strip()
+        return results
+
+    async def aquery_many(self, model_names: list, prompt: str,
+                          max_tokens: int, max_concurrency: int = 4) -> dict:
+        """
+        Sends the same prompt to several models concurrently (for ensemble
+        hint generation or A/B evaluation) and returns their answers keyed
+        by model name. All calls run in parallel via asyncio.gather, so wall
+        time is the slowest provider's latency rather than the sum of all of
+        them. A semaphore bounds in-flight calls to respect provider rate
+        limits.
+
+        Args:
+            model_names (list): The models to query (each routed as in aquery).
+            prompt (str): The prompt to send to every model.
+            max_tokens (int): The maximum number of tokens per response.
+            max_concurrency (int): Upper bound on simultaneous API calls.
+
+        Returns:
+            dict: model_name -> response text (the fallback string for any
+                  model whose call failed).
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def query_one(name):
+            async with semaphore:
+                return await self.aquery(name, prompt, max_tokens)
+
+        results = await asyncio.gather(
+            *(query_one(name) for name in model_names),
+            return_exceptions=True)
+
+        responses = {}
+        for name, result in zip(model_names, results):
+            if isinstance(result, Exception):
+                logger.error(f"Fan-out call to '{name}' failed: {result}")
+                responses[name] = FALLBACK_RESPONSE
+            else:
+                responses[name] = result
+        return responses
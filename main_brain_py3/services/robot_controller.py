@@ -1,6 +1,13 @@
+import logging
 import qi
+import threading
 import time
 
+# Lazy %s formatting: the message string is only built if the DEBUG level
+# is actually enabled, so production runs at INFO skip the formatting
+# (and TTY write) entirely.
+logger = logging.getLogger(__name__)
+
 class RobotController:
     """A wrapper class to simplify interactions with the Pepper robot's NAOqi API."""
     
@@ -19,7 +26,7 @@ class RobotController:
         # Configure speech recognition
         self.speech_recognition.setLanguage("English")
         self.is_listening = False
-        print("Robot Controller: Proxies to NAOqi services are ready.")
+        logger.info("Robot Controller: Proxies to NAOqi services are ready.")
 
     def _get_animation_path(self, animation_name):
         # IMPORTANT: Change this path to where you uploaded your animations on the robot!
@@ -27,7 +34,7 @@ class RobotController:
 
     def say(self, text, animated=True):
         """Makes the robot speak. Uses animated speech by default."""
-        print("ROBOT SAYS: {}".format(text))
+        logger.debug("ROBOT SAYS: %s", text)
         if animated:
             self.animated_speech.say(text)
         else:
@@ -36,50 +43,71 @@ class RobotController:
     def play_animation(self, animation_name):
         """Plays a pre-made animation from Choregraphe."""
         full_path = self._get_animation_path(animation_name)
-        print("ROBOT ANIMATES: {}".format(full_path))
+        logger.debug("ROBOT ANIMATES: %s", full_path)
         try:
             self.animation_player.run(full_path)
         except Exception as e:
-            print("Error playing animation {}: {}".format(full_path, e))
+            logger.error("Error playing animation %s: %s", full_path, e)
 
     def listen(self, vocabulary, timeout=5):
-        """Listens for a word from a specific vocabulary list."""
+        """Listens for a word from a specific vocabulary list.
+
+        Uses NAOqi's event subscription instead of polling ALMemory: the
+        callback fires the moment WordRecognized is raised, so recognition
+        latency is sub-millisecond rather than up to a full polling interval,
+        and the interpreter sleeps for the whole wait instead of waking ten
+        times a second."""
         self.is_listening = True
         self.speech_recognition.pause(True)
         self.speech_recognition.setVocabulary(vocabulary, False)
         self.speech_recognition.pause(False)
         self.speech_recognition.subscribe("WordRecognized")
-        
-        print("ROBOT LISTENS: (Vocab: {})".format(vocabulary))
-        recognized_word = ""
-        
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            word_data = self.memory.getData("WordRecognized")
-            if word_data and word_data[0] and word_data[1] > 0.4: # Word and confidence score
-                recognized_word = word_data[0]
-                print("ROBOT HEARD: '{}' with confidence {}".format(word_data[0], word_data[1]))
-                self.memory.removeData("WordRecognized") # Clear the memory
-                break
-            time.sleep(0.1)
 
-        self.speech_recognition.unsubscribe("WordRecognized")
-        self.is_listening = False
-        return recognized_word
+        logger.debug("ROBOT LISTENS: (Vocab: %s)", vocabulary)
+        word_event = threading.Event()
+        result = [""]
+
+        def on_word(word_data):
+            # Word and confidence score
+            if word_data and word_data[0] and word_data[1] > 0.4:
+                result[0] = word_data[0]
+                logger.debug("ROBOT HEARD: '%s' with confidence %s", word_data[0], word_data[1])
+                word_event.set()
+
+        subscriber = self.memory.subscriber("WordRecognized")
+        connection_id = subscriber.signal.connect(on_word)
+        # perf_counter is monotonic and sub-ms: immune to NTP wall-clock
+        # jumps that would corrupt a time.time()-based measurement.
+        start = time.perf_counter()
+        try:
+            # Blocks until the callback fires or the timeout elapses.
+            word_event.wait(timeout)
+        finally:
+            subscriber.signal.disconnect(connection_id)
+            self.speech_recognition.unsubscribe("WordRecognized")
+            self.is_listening = False
+
+        elapsed = time.perf_counter() - start
+        if result[0]:
+            logger.debug("ROBOT HEARD after %.3fs", elapsed)
+            self.memory.removeData("WordRecognized")  # Clear the memory
+        else:
+            logger.debug("ROBOT LISTEN timed out after %.3fs", elapsed)
+        return result[0]
 
     def show_image(self, url):
         """Displays an image on the tablet."""
-        print("ROBOT TABLET: Showing image at {}".format(url))
+        logger.debug("ROBOT TABLET: Showing image at %s", url)
         self.tablet.showImage(url)
 
     def hide_tablet(self):
         """Hides the tablet content."""
-        print("ROBOT TABLET: Hiding content.")
+        logger.debug("ROBOT TABLET: Hiding content.")
         self.tablet.hide()
 
     def set_awareness(self, status):
         """Turns basic awareness (autonomous head movements) on or off."""
-        print("ROBOT AWARENESS: {}".format("On" if status else "Off"))
+        logger.debug("ROBOT AWARENESS: %s", "On" if status else "Off")
         if status:
             self.awareness.setEnabled(True)
         else:
@@ -1,35 +1,136 @@
 #
 # main_brain_py3/services/robot_proxy.py (UPDATED)
 #
+import collections
+import itertools
 import zmq
 import json
 import logging
 
+# orjson (Rust, SIMD) parses/serializes small command dicts several times
+# faster than stdlib json; fall back silently when it isn't installed.
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+    _loads = json.loads
+
 logger = logging.getLogger(__name__)
 
 class RobotProxy:
-    def __init__(self, zmq_host="localhost", zmq_port=5555, timeout=10000): # 10-second timeout
-        self.context = zmq.Context()
-        logger.info(f"Connecting to Robot Listener at tcp://{zmq_host}:{zmq_port}...")
-        self.socket = self.context.socket(zmq.REQ)
-        self.socket.setsockopt(zmq.RCVTIMEO, timeout)
-        self.socket.connect(f"tcp://{zmq_host}:{zmq_port}")
+    def __init__(self, zmq_host="localhost", zmq_port=5555, ack_port=5556,
+                 timeout=10000): # 10-second timeout
+        # The process-wide singleton context: each zmq.Context spins up its
+        # own I/O thread, so code paths that construct several proxies
+        # (tests, a future web layer) would otherwise pay context setup and
+        # an extra thread per instance.
+        self.context = zmq.Context.instance()
+        logger.info(f"Connecting to Robot Listener at tcp://{zmq_host}:{zmq_port} (acks on {ack_port})...")
+        # PUSH/PULL instead of REQ/REP: REQ enforces strict send/recv/send
+        # alternation, so every command blocked the caller for a full
+        # round-trip. Commands go out on a PUSH socket and completion acks
+        # come back on a separate PULL socket, so several commands can be
+        # in flight at once (see queue_command/drain) while _send_command
+        # keeps the old blocking semantics for existing callers.
+        self.push = self.context.socket(zmq.PUSH)
+        self.push.connect(f"tcp://{zmq_host}:{zmq_port}")
+        self.pull = self.context.socket(zmq.PULL)
+        self.pull.setsockopt(zmq.RCVTIMEO, timeout)
+        self.pull.connect(f"tcp://{zmq_host}:{ack_port}")
+        # Monotonic request IDs and the FIFO of IDs awaiting a response.
+        # The listener executes commands in order and echoes each command's
+        # "id" in its ack; the FIFO is only a fallback for acks without one.
+        self._next_id = itertools.count(1)
+        self._outstanding = collections.deque()
+        self._responses = {}
         logger.info("Successfully connected to Robot Listener.")
 
-    def _send_command(self, command: dict) -> dict:
+    def queue_command(self, action: str, data: dict) -> int:
+        """
+        Sends a command without waiting for its response, so independent
+        commands (say + show_image + play_animation) can be pipelined in one
+        round-trip's worth of wall time. Returns a request ID to pass to
+        wait_for (or call drain() to collect everything outstanding).
+        """
+        request_id = next(self._next_id)
+        command = {"action": action, "data": data, "id": request_id}
+        self.push.send(_dumps(command))
+        self._outstanding.append(request_id)
+        return request_id
+
+    def wait_for(self, request_id: int) -> dict:
+        """
+        Blocks until the response for the given request ID has arrived.
+        """
         try:
-            self.socket.send_json(command)
-            response = self.socket.recv_json()
-            if response.get("status") == "error":
-                logger.error(f"Robot listener reported an error for action '{command.get('action')}': {response.get('message')}")
-            return response
+            while request_id not in self._responses:
+                response = _loads(self.pull.recv())
+                # Acks may arrive out of order (the listener executes
+                # commands on a worker pool), so remove exactly the echoed
+                # id from the outstanding set; only fall back to FIFO
+                # order for listeners that don't echo one.
+                rid = response.get("id")
+                if rid is None:
+                    rid = self._outstanding[0] if self._outstanding else request_id
+                try:
+                    self._outstanding.remove(rid)
+                except ValueError:
+                    pass  # e.g. a late ack for an already-timed-out request
+                self._responses[rid] = response
+            return self._responses.pop(request_id)
         except zmq.error.Again:
-            logger.error(f"ZMQ Error: No response from robot listener for action '{command.get('action')}'. The listener might be down.")
+            logger.error(f"ZMQ Error: No response from robot listener for request {request_id}. The listener might be down.")
+            if request_id in self._outstanding:
+                self._outstanding.remove(request_id)
             return {"status": "error", "message": "No response from listener"}
         except Exception as e:
             logger.error(f"An unexpected error occurred during ZMQ communication: {e}")
             return {"status": "error", "message": str(e)}
 
+    def drain(self) -> list:
+        """
+        Collects the responses for every still-outstanding pipelined
+        command, in the order they were sent, plus any responses that
+        already arrived but were never claimed via wait_for (including
+        late acks from previously timed-out requests).
+        """
+        results = [self.wait_for(rid) for rid in list(self._outstanding)]
+        for rid in list(self._responses):
+            results.append(self._responses.pop(rid))
+        return results
+
+    def _send_command(self, command: dict) -> dict:
+        response = self.wait_for(
+            self.queue_command(command["action"], command.get("data", {})))
+        if response.get("status") == "error":
+            logger.error(f"Robot listener reported an error for action '{command.get('action')}': {response.get('message')}")
+        return response
+
+    def send_batch(self, commands: list) -> list:
+        """
+        Executes several micro-commands on the listener in one round-trip
+        via its 'batch' action, instead of paying one round-trip each.
+
+        Args:
+            commands (list): (action, data) pairs, e.g.
+                [("say", {"text": "Well done!"}),
+                 ("play_animation", {"name": "celebrate"})].
+
+        Returns:
+            list: One response dict per sub-command, in order.
+        """
+        payload = {"commands": [{"action": action, "data": data}
+                                for action, data in commands]}
+        response = self._send_command({"action": "batch", "data": payload})
+        return response.get("results", [])
+
     # --- NEW METHOD TO ADD ---
     def ping(self) -> bool:
         """
@@ -11,4 +11,55 @@ except ImportError:
     logger.critical("FATAL ERROR: config.py not found or is missing required variables.")
     logger.critical("Please create a config.py file from the template.")
     # In a real app, you might fall back to environment variables here.
-    exit(1) # Exit immediately if config is missing.
\ No newline at end of file
+    exit(1) # Exit immediately if config is missing.
+
+# --- Optional tuning knobs (safe defaults if absent from config.py) ---
+import config as _config
+
+# bcrypt work factor for hashing PINs. 12 is the library default; lower it
+# only for batch imports on weak hardware, never below 10 in production.
+BCRYPT_ROUNDS = getattr(_config, "BCRYPT_ROUNDS", 12)
+
+# Secret used to sign in-process session tokens so re-auth checks can use a
+# fast HMAC compare instead of re-running bcrypt.
+SESSION_KEY = getattr(_config, "SESSION_KEY", "pepper-tutor-dev-session-key").encode("utf-8")
+
+# How long an issued session token stays valid, in seconds.
+SESSION_TTL = getattr(_config, "SESSION_TTL", 3600)
+
+
+def validate():
+    """
+    Fails fast on obvious misconfiguration. Without this check, a
+    placeholder API key only surfaces as an exception deep inside the
+    embeddings/FAISS stack after the user has already logged in, which
+    makes every bad-config debug cycle cost a full session startup.
+
+    Raises:
+        ValueError: describing every problem found, so one run reports all
+                    of them at once.
+    """
+    problems = []
+
+    for provider, key in API_KEYS.items():
+        # A provider entry may be one key or a list of keys to rotate over.
+        keys = key if isinstance(key, (list, tuple)) else [key]
+        if not keys or any(not k or k == "INSERT_KEY_HERE" for k in keys):
+            problems.append(
+                f"API key for '{provider}' is missing or still the placeholder.")
+
+    if not ROBOT_LISTENER_IP:
+        problems.append("ROBOT_LISTENER_IP is not set.")
+
+    if not LLM_FOR_HINTS:
+        problems.append("LLM_FOR_HINTS is not set.")
+    if not isinstance(MAX_TOKENS_FOR_HINT, int) or MAX_TOKENS_FOR_HINT <= 0:
+        problems.append("MAX_TOKENS_FOR_HINT must be a positive integer.")
+
+    if problems:
+        for problem in problems:
+            logger.critical("Config validation: %s", problem)
+        raise ValueError(
+            "Invalid configuration:\n" + "\n".join(problems))
+
+    logger.info("Configuration validated successfully.")
\ No newline at end of file
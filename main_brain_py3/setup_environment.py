@@ -23,9 +23,26 @@
 #      long-term, searchable memory for puzzle-related context.
 #
 
+import asyncio
+import hashlib
 import logging
 import json
 import sys
+from pathlib import Path
+
+# orjson (Rust, SIMD) parses JSON several times faster than stdlib json;
+# fall back silently when it isn't installed (same pattern as the ZMQ
+# command path in services/robot_proxy.py).
+try:
+    import orjson
+
+    def _load_json(path):
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+except ImportError:
+    def _load_json(path):
+        with open(path, 'r') as f:
+            return json.load(f)
 
 # --- Import Project-Specific Modules ---
 # Import the new utility for standardized logging
@@ -36,6 +53,8 @@ from services.database_manager import DatabaseManager
 from services.document_processor import DocumentProcessor
 from langchain_community.vectorstores import FAISS
 from langchain_openai import OpenAIEmbeddings
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
 import settings
 
 # --- Initial Setup ---
@@ -43,6 +62,72 @@ import settings
 setup_logging()
 logger = logging.getLogger(__name__)
 
+# Below this many chunks the flat index stays: IVF-PQ needs enough vectors
+# to train its coarse quantizer well, and a brute-force scan over a small
+# corpus is already fast.
+IVFPQ_MIN_VECTORS = 2048
+
+
+async def embed_documents_concurrently(embeddings, texts,
+                                       batch_size=100, max_concurrency=8):
+    """
+    Embeds all texts by fanning batches out concurrently instead of the
+    sequential batching inside FAISS.from_documents. The embedding phase is
+    network-bound, so overlapping requests cuts its wall time by roughly the
+    concurrency factor. A semaphore keeps us under the API rate limits, and
+    going through the (cache-backed) embeddings object preserves the on-disk
+    embedding cache.
+
+    Returns:
+        list: One embedding vector per input text, in input order.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    batches = [texts[i:i + batch_size]
+               for i in range(0, len(texts), batch_size)]
+
+    async def embed_batch(batch):
+        async with semaphore:
+            return await embeddings.aembed_documents(batch)
+
+    results = await asyncio.gather(*(embed_batch(b) for b in batches))
+    return [vector for batch in results for vector in batch]
+
+
+def compress_vector_store(vector_store):
+    """
+    Swaps the FAISS index inside the store from the default IndexFlatL2
+    (O(N) scan, full FP32 storage) to IVF-PQ (inverted file + product
+    quantization: sub-linear search and ~32x smaller vectors) once the
+    corpus is big enough for the quantizer to train on. Small corpora are
+    returned untouched.
+    """
+    import math
+    import faiss
+
+    index = vector_store.index
+    total, dim = index.ntotal, index.d
+    if total < IVFPQ_MIN_VECTORS:
+        logger.info(
+            "Keeping flat FAISS index (%d vectors, below IVF-PQ threshold of %d).",
+            total, IVFPQ_MIN_VECTORS)
+        return vector_store
+
+    logger.info("Compressing FAISS index with IVF-PQ (%d vectors)...", total)
+    vectors = index.reconstruct_n(0, total)
+    n_lists = max(1, min(int(4 * math.sqrt(total)), total // 40))
+    # 8-dimensional subvectors quantized to 8 bits each.
+    m = max(1, dim // 8)
+    quantizer = faiss.IndexFlatL2(dim)
+    ivfpq = faiss.IndexIVFPQ(quantizer, dim, n_lists, m, 8)
+    ivfpq.train(vectors)
+    ivfpq.add(vectors)
+    # How many inverted lists each query probes; 16 trades a little recall
+    # for a large speedup over the flat scan.
+    ivfpq.nprobe = 16
+    vector_store.index = ivfpq
+    logger.info("IVF-PQ index built: nlist=%d, m=%d.", n_lists, m)
+    return vector_store
+
 
 def setup_environment():
     """
@@ -70,15 +155,14 @@ def setup_environment():
     logger.info("----------------------------------------------------------")
     logger.info("STEP 2: Populating user profiles from 'data/users.json'...")
     try:
-        with open('data/users.json', 'r') as f:
-            users = json.load(f)
-            if not users:
-                logger.warning(
-                    "data/users.json is empty. No users will be added.")
-            for user in users:
-                # Add each user to the database. The DatabaseManager handles hashing the PIN.
-                db.add_user(user['username'], user['pin'], user['profile'])
-                logger.info(f"  - Added user: {user['username']}")
+        users = _load_json('data/users.json')
+        if not users:
+            logger.warning(
+                "data/users.json is empty. No users will be added.")
+        for user in users:
+            # Add each user to the database. The DatabaseManager handles hashing the PIN.
+            db.add_user(user['username'], user['pin'], user['profile'])
+            logger.info(f"  - Added user: {user['username']}")
         logger.info("STEP 2: User population complete.")
     except FileNotFoundError:
         logger.error(
@@ -93,6 +177,43 @@ def setup_environment():
 
     # You MUST create this PDF yourself and place it in the 'main_brain_py3/data/' folder.
     puzzle_source_file = 'data/puzzles.pdf'
+
+    # Short-circuit when the existing vector store was built from exactly
+    # this PDF: a stamp file inside vector_store/ records the source hash,
+    # so re-running setup after a config or user change skips the whole
+    # embedding + index build.
+    try:
+        with open(puzzle_source_file, 'rb') as f:
+            pdf_hash = hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        logger.critical(
+            f"FATAL: The puzzle source file '{puzzle_source_file}' was not found. The application cannot build the AI's memory.")
+        sys.exit(1)
+
+    stamp_path = Path("vector_store/.source_hash")
+    if stamp_path.exists() and stamp_path.read_text().strip() == pdf_hash:
+        logger.info(
+            "STEP 3: Vector store is already up-to-date with '%s'. Skipping rebuild.",
+            puzzle_source_file)
+    else:
+        build_vector_store(puzzle_source_file)
+        # Stamp only after a successful build, so a crash mid-build cannot
+        # leave a stale store masquerading as current.
+        stamp_path.write_text(pdf_hash)
+
+    # --- Final Confirmation ---
+    logger.info("----------------------------------------------------------")
+    logger.info(
+        "✅  Environment setup complete! You are now ready to run the main application.")
+    logger.info("==========================================================")
+
+
+def build_vector_store(puzzle_source_file):
+    """
+    Processes the puzzle PDF and builds + saves the FAISS vector store.
+    Exits the process on any fatal error, matching the rest of the setup
+    script's fail-fast behavior.
+    """
     doc_processor = DocumentProcessor()
 
     try:
@@ -113,10 +234,55 @@ def setup_environment():
     logger.info("STEP 3: Creating AI vector store using OpenAI embeddings. This may take a moment and requires an internet connection...")
     try:
         # Use the OpenAI embedding model to convert text chunks into numerical vectors.
-        embeddings = OpenAIEmbeddings(api_key=settings.API_KEYS["openai"])
+        # API_KEYS entries may be a single key or a list of keys to rotate
+        # over; embedding setup just uses the first one.
+        openai_key = settings.API_KEYS["openai"]
+        if isinstance(openai_key, (list, tuple)):
+            openai_key = openai_key[0]
+        raw_embeddings = OpenAIEmbeddings(api_key=openai_key)
+
+        # Cache each chunk's embedding on disk, keyed by a hash of its text.
+        # Re-running setup after a small PDF edit then only re-embeds the
+        # changed chunks; for an unchanged PDF the whole embedding phase is
+        # local-disk reads instead of API calls.
+        embedding_store = LocalFileStore("./.emb_cache")
+        embeddings = CacheBackedEmbeddings.from_bytes_store(
+            raw_embeddings, embedding_store, namespace=raw_embeddings.model)
+
+        # Embed all chunks concurrently, then build the store from the
+        # precomputed vectors. FAISS.from_documents would ship the batches
+        # sequentially, making embedding the dominant wall-time cost for a
+        # PDF with hundreds of chunks.
+        texts = [doc.page_content for doc in documents]
+        metadatas = [doc.metadata for doc in documents]
 
-        # Create the FAISS vector store from the documents and their embeddings.
-        vector_store = FAISS.from_documents(documents, embeddings)
+        # Deduplicate identical chunks (repeated headers, boilerplate
+        # puzzle templates) before embedding: only unique texts hit the
+        # API, then the full vector list is rebuilt by index so every
+        # document still gets its embedding.
+        seen = {}
+        unique_texts = []
+        mapping = []
+        for text in texts:
+            digest = hashlib.sha256(text.encode('utf-8')).digest()
+            idx = seen.get(digest)
+            if idx is None:
+                idx = seen[digest] = len(unique_texts)
+                unique_texts.append(text)
+            mapping.append(idx)
+        if len(unique_texts) < len(texts):
+            logger.info(
+                "Deduplicated %d chunks down to %d unique before embedding.",
+                len(texts), len(unique_texts))
+
+        unique_vectors = asyncio.run(
+            embed_documents_concurrently(embeddings, unique_texts))
+        vectors = [unique_vectors[i] for i in mapping]
+        vector_store = FAISS.from_embeddings(
+            list(zip(texts, vectors)), embeddings, metadatas=metadatas)
+
+        # For large corpora, swap the flat index for a trained IVF-PQ one.
+        vector_store = compress_vector_store(vector_store)
 
         # Save the completed vector store to a local folder for the main application to load.
         vector_store.save_local("vector_store")
@@ -128,12 +294,6 @@ def setup_environment():
             f"Failed to create the vector store. Is your OpenAI API key valid? Error: {e}", exc_info=True)
         sys.exit(1)
 
-    # --- Final Confirmation ---
-    logger.info("----------------------------------------------------------")
-    logger.info(
-        "✅  Environment setup complete! You are now ready to run the main application.")
-    logger.info("==========================================================")
-
 
 if __name__ == "__main__":
     # This block ensures the setup_environment function is called only when
@@ -14,12 +14,72 @@
 # - Simulates tablet display in console
 #
 
+import os
 import qi
+import select
 import sys
+import threading
 import time
 import json
+import Queue  # Python 2 stdlib thread-safe queue
 import zmq  # ZeroMQ for network communication
 
+# Monotonic clock for deadline arithmetic: immune to NTP wall-clock jumps
+# that can stretch or collapse a time.time()-based timeout. Python 2.7 has
+# no time.monotonic, so fall back to time.time there.
+_monotonic = getattr(time, "monotonic", time.time)
+
+# How many NAOqi actions may run concurrently. Long physical actions
+# (say, listen) no longer block the ZMQ loop from dequeuing the next
+# command, so e.g. show_image can run while say is still speaking.
+WORKER_COUNT = 3
+
+# CPU core to pin the listener to (where supported). Keeping the process
+# off the busy cores cuts scheduler wakeup jitter after a ZMQ message.
+LISTENER_CPU = 3
+
+
+def _tune_scheduling():
+    """
+    Best-effort latency tuning: pin the process to one core and raise its
+    scheduling priority so the kernel wakes it promptly on socket.recv.
+    Every step is optional — Python 2.7 lacks os.sched_setaffinity, and
+    SCHED_FIFO/nice need privileges — so each is probed with getattr and
+    wrapped in try/except. In production, run the listener under
+    taskset/chrt for the same effect without code support.
+    """
+    set_affinity = getattr(os, "sched_setaffinity", None)  # Python 3 only
+    if set_affinity is not None:
+        try:
+            set_affinity(0, {LISTENER_CPU})
+            print("[Scheduler] Pinned to CPU {}.".format(LISTENER_CPU))
+        except (OSError, ValueError) as e:
+            print("[Scheduler] Could not set CPU affinity: {}".format(e))
+
+    set_scheduler = getattr(os, "sched_setscheduler", None)  # Python 3 only
+    if set_scheduler is not None:
+        try:
+            set_scheduler(0, os.SCHED_FIFO, os.sched_param(20))
+            print("[Scheduler] SCHED_FIFO priority 20 set.")
+            return
+        except OSError as e:
+            print("[Scheduler] Could not set SCHED_FIFO (needs root): {}".format(e))
+
+    # Fallback available on Python 2.7: a better nice level still helps.
+    try:
+        os.nice(-10)
+        print("[Scheduler] Process niceness lowered to -10.")
+    except OSError as e:
+        print("[Scheduler] Could not renice (needs privileges): {}".format(e))
+
+# ujson (C implementation) parses/serializes the small command dicts several
+# times faster than stdlib json; fall back silently when it isn't installed.
+# (The Python 3 brain side uses orjson, which has no Python 2 build.)
+try:
+    import ujson as json_fast
+except ImportError:
+    json_fast = json
+
 # ==============================================================================
 # CONFIGURATION SECTION
 # ==============================================================================
@@ -36,6 +96,23 @@ ROBOT_PORT = 9559  # <--- !!! CHANGE THIS TO YOUR CHOREGRAPHE PORT !!!
 
 # ==============================================================================
 
+
+def _make_simple_handler(fn, ok_response, arg_key):
+    """
+    Specializes a trivial one-argument action into a closure over the
+    NAOqi bound method and its constant success response, so the per-call
+    body is a dict get, one call and a constant return — no attribute
+    resolution, no response allocation.
+    """
+    def handler(data):
+        value = data.get(arg_key)
+        if not isinstance(value, basestring):
+            value = str(value)
+        fn(value)
+        return ok_response
+    return handler
+
+
 class RobotController:
     """
     A wrapper class that holds all the necessary NAOqi service proxies.
@@ -63,110 +140,284 @@ class RobotController:
             except Exception:
                 print("[Init Warning] Could not set language. Speech Reco might be inactive in Sim.")
                 
+            # Hoisted bound methods: each self.animated_speech.say lookup
+            # costs two instance-dict resolutions per command on the hot
+            # loop; binding them once here makes each handler a single
+            # local call.
+            self._say_animated = self.animated_speech.say
+            self._show_tablet_image = self.tablet.showImage
+            self._run_behavior = self.behavior_manager.runBehavior
+            self._is_installed = self.behavior_manager.isBehaviorInstalled
+            self._motion_rest = self.motion.rest
+
+            # Installed-behavior cache: isBehaviorInstalled is a full
+            # NAOqi RPC, and the installed set changes rarely. One bulk
+            # RPC here replaces one RPC per play_animation; a
+            # reload_behaviors action rebuilds it after deploys.
+            try:
+                self._installed_behaviors = set(
+                    self.behavior_manager.getInstalledBehaviors())
+            except Exception:
+                self._installed_behaviors = set()
+
             print("[Robot Listener] NAOqi service proxies are ready.")
-            
+
         except Exception as e:
             print("[Init Error] Failed to get some services: {}".format(e))
 
+        # Event-driven word recognition: an ALMemory subscriber fires
+        # _on_word the moment WordRecognized is raised, so the real-robot
+        # listen path blocks on a single Event.wait(timeout) instead of
+        # busy-polling memory.getData every 100 ms (10 RPCs per second,
+        # up to 100 ms added latency per word).
+        self._word_event = threading.Event()
+        self._word_result = [""]
+        # Last vocabulary installed in the recognizer: tutoring loops
+        # reuse the same vocabulary many turns in a row, and the
+        # pause/setVocabulary/pause dance is three NAOqi RPCs that also
+        # briefly disable recognition.
+        self._last_vocab = None
+        try:
+            self._word_subscriber = self.memory.subscriber("WordRecognized")
+            self._word_subscriber.signal.connect(self._on_word)
+        except Exception as e:
+            print("[Init Warning] Could not connect WordRecognized signal: {}".format(e))
+
+        # Serializes listen state (vocab cache, word event/result, stdin in
+        # simulation) now that commands run on a small worker pool.
+        self._listen_lock = threading.Lock()
+
+        # Subscribe the recognizer once at startup instead of per listen:
+        # each subscribe/unsubscribe is a NAOqi RPC plus bookkeeping on
+        # the robot. The rest action unsubscribes; a later listen
+        # resubscribes lazily.
+        self._reco_subscribed = False
+        try:
+            self.speech_recognition.subscribe("RobotListener")
+            self._reco_subscribed = True
+        except Exception as e:
+            print("[Init Warning] Could not subscribe speech recognition: {}".format(e))
+
+        # Constant success responses, built once: the ok replies for the
+        # fire-and-forget actions never change shape, so handlers return
+        # these shared dicts instead of allocating a fresh one per command.
+        # execute_command copies before attaching a command id.
+        self._ok_responses = {
+            action: {"status": "ok", "action": action}
+            for action in ("say", "ping", "show_image", "rest",
+                           "play_animation")
+        }
+
+        # Jump table: one dict lookup per command instead of walking an
+        # if/elif ladder of string compares on the hot ZMQ loop. The
+        # trivial actions are specialized closures (see
+        # _make_simple_handler); the stateful ones stay methods. getattr
+        # keeps construction safe if a service proxy failed above — the
+        # per-command try/except reports the failure instead.
+        self._handlers = {
+            "say": _make_simple_handler(
+                getattr(self, "_say_animated", None),
+                self._ok_responses["say"], "text"),
+            "ping": lambda _data: self._ok_responses["ping"],
+            "play_animation": self._do_play_animation,
+            "show_image": self._do_show_image,
+            "rest": self._do_rest,
+            "listen": self._do_listen,
+            "reload_behaviors": self._do_reload_behaviors,
+            "batch": self._do_batch,
+        }
+
     def execute_command(self, command):
         """
-        Parses a JSON command and executes the corresponding robot action.
+        Parses a JSON command, executes the corresponding robot action and
+        echoes the command's "id" (if any) in the response so the Brain can
+        match acks to pipelined commands.
         """
+        response = self._execute_action(command)
+        command_id = command.get("id")
+        if command_id is not None:
+            # Copy before mutating: success responses are shared constants.
+            response = dict(response)
+            response["id"] = command_id
+        return response
+
+    def _execute_action(self, command):
         action = command.get("action")
         data = command.get("data", {})
         print("[Robot Listener] Received command: '{}'".format(action))
 
-        try:
-            # --- 1. SAY (Works in both) ---
-            if action == "say":
-                text_to_say = str(data.get("text"))
-                # In sim, sometimes animated speech doesn't show movement, but TTS works
-                self.animated_speech.say(text_to_say)
-                return {"status": "ok", "action": "say"}
-
-            # --- 2. PING (Works in both) ---
-            elif action == "ping":
-                return {"status": "ok", "action": "ping"}
-
-            # --- 3. ANIMATION (Works in both if behavior exists) ---
-            elif action == "play_animation":
-                behavior_name = data.get("name")
-                if self.behavior_manager.isBehaviorInstalled(behavior_name):
-                    self.behavior_manager.runBehavior(behavior_name)
-                    return {"status": "ok", "action": "play_animation"}
-                else:
-                    error_msg = "Behavior '{}' not found.".format(behavior_name)
-                    print("[Error] " + error_msg)
-                    return {"status": "error", "message": error_msg}
-
-            # --- 4. SHOW IMAGE (SWITCHED FOR SIMULATION) ---
-            elif action == "show_image":
-                url = str(data.get("url"))
-                
-                # --- [SIMULATION MODE] ---
-                try:
-                    # Try to use the service, but print to console regardless
-                    self.tablet.showImage(url)
-                    print("\n[SIMULATION TABLET] Displaying Image: {}\n".format(url))
-                except Exception:
-                    print("\n[SIMULATION TABLET] (Service Unavailable) Imagine showing: {}\n".format(url))
-                return {"status": "ok", "action": "show_image"}
-
-                # --- [REAL ROBOT MODE] (COMMENTED OUT) ---
-                # self.tablet.showImage(url)
-                # return {"status": "ok", "action": "show_image"}
-
-            # --- 5. REST (Works in both) ---
-            elif action == "rest":
-                self.motion.rest()
-                return {"status": "ok", "action": "rest"}
-
-            # --- 6. LISTEN (SWITCHED FOR SIMULATION) ---
-            elif action == "listen":
-                vocabulary = data.get("vocabulary", [])
-                timeout = data.get("timeout", 10)
-
-                # --- [SIMULATION MODE] (KEYBOARD INPUT) ---
-                print("\n" + "="*40)
-                print("[SIMULATION INPUT REQUIRED]")
-                print("The Robot is listening for: {}".format(vocabulary))
-                print("Please TYPE your answer below:")
-                print("="*40 + "\n")
-
-                # Python 2 'raw_input' reads text from the terminal
-                user_typed = raw_input("YOU SAY: ")
-                return {"status": "ok", "action": "listen", "result": user_typed}
-
-                # --- [REAL ROBOT MODE] (SPEECH RECOGNITION) (COMMENTED OUT) ---
-                # self.speech_recognition.pause(True)
-                # self.speech_recognition.setVocabulary(vocabulary, False)
-                # self.speech_recognition.pause(False)
-                # self.speech_recognition.subscribe("WordRecognized")
-                # recognized_word = ""
-                # start_time = time.time()
-                # while time.time() - start_time < timeout:
-                #     word_data = self.memory.getData("WordRecognized")
-                #     if word_data and word_data[0] and word_data[1] > 0.4:
-                #         recognized_word = word_data[0]
-                #         self.memory.removeData("WordRecognized")
-                #         break
-                #     time.sleep(0.1)
-                # self.speech_recognition.unsubscribe("WordRecognized")
-                # return {"status": "ok", "action": "listen", "result": recognized_word}
-
-            else:
-                return {"status": "error", "message": "Unknown action"}
+        handler = self._handlers.get(action)
+        if handler is None:
+            return {"status": "error", "message": "Unknown action"}
 
+        try:
+            return handler(data)
         except Exception as e:
             error_message = "Error executing action '{}': {}".format(action, e)
             print("[Robot Listener Error] " + error_message)
             return {"status": "error", "message": error_message}
 
+    # --- Per-action handlers (looked up via the jump table) ---
+
+    # (say and ping are specialized closures built in __init__; see
+    # _make_simple_handler. In sim, sometimes animated speech doesn't show
+    # movement, but TTS works.)
+
+    # 3. ANIMATION (Works in both if behavior exists)
+    def _do_play_animation(self, data):
+        behavior_name = data.get("name")
+        # Consult the local cache first; only fall back to the
+        # isBehaviorInstalled RPC for names we haven't seen yet.
+        if behavior_name not in self._installed_behaviors:
+            if not self._is_installed(behavior_name):
+                error_msg = "Behavior '{}' not found.".format(behavior_name)
+                print("[Error] " + error_msg)
+                return {"status": "error", "message": error_msg}
+            self._installed_behaviors.add(behavior_name)
+        self._run_behavior(behavior_name)
+        return self._ok_responses["play_animation"]
+
+    # 4. SHOW IMAGE (SWITCHED FOR SIMULATION)
+    def _do_show_image(self, data):
+        url = data.get("url")
+        if not isinstance(url, basestring):
+            url = str(url)
+
+        # --- [SIMULATION MODE] ---
+        try:
+            # Try to use the service, but print to console regardless
+            self._show_tablet_image(url)
+            print("\n[SIMULATION TABLET] Displaying Image: {}\n".format(url))
+        except Exception:
+            print("\n[SIMULATION TABLET] (Service Unavailable) Imagine showing: {}\n".format(url))
+        return self._ok_responses["show_image"]
+
+        # --- [REAL ROBOT MODE] (COMMENTED OUT) ---
+        # self.tablet.showImage(url)
+        # return self._ok_responses["show_image"]
+
+    # 0. BATCH (execute several sub-commands in one round-trip)
+    def _do_batch(self, data):
+        # A typical "say + show_image + play_animation" sequence used to
+        # cost three round-trips; as one batch it costs one.
+        results = []
+        for sub in data.get("commands", []):
+            results.append(self.execute_command(sub))
+        return {"status": "ok", "action": "batch", "results": results}
+
+    # 3b. RELOAD BEHAVIORS (refresh the installed-behavior cache)
+    def _do_reload_behaviors(self, data):
+        self._installed_behaviors = set(
+            self.behavior_manager.getInstalledBehaviors())
+        return {"status": "ok", "action": "reload_behaviors",
+                "count": len(self._installed_behaviors)}
+
+    # 5. REST (Works in both)
+    def _do_rest(self, data):
+        # The session is over: release the recognizer subscription held
+        # since startup.
+        if self._reco_subscribed:
+            try:
+                self.speech_recognition.unsubscribe("RobotListener")
+            except Exception:
+                pass
+            self._reco_subscribed = False
+        self._motion_rest()
+        return self._ok_responses["rest"]
+
+    # 6. LISTEN (SWITCHED FOR SIMULATION)
+    def _do_listen(self, data):
+        vocabulary = data.get("vocabulary", [])
+        timeout = data.get("timeout", 10)
+
+        # --- [SIMULATION MODE] (KEYBOARD INPUT) ---
+        with self._listen_lock:
+            print("\n" + "="*40)
+            print("[SIMULATION INPUT REQUIRED]")
+            print("The Robot is listening for: {}".format(vocabulary))
+            print("Please TYPE your answer below (timeout: {}s):".format(timeout))
+            print("="*40 + "\n")
+
+            # select-based read instead of raw_input: honors the same
+            # timeout field as the real-robot path and can't hang the
+            # worker forever waiting for the operator.
+            sys.stdout.write("YOU SAY: ")
+            sys.stdout.flush()
+            user_typed = self._read_line_with_timeout(timeout)
+        return {"status": "ok", "action": "listen", "result": user_typed}
+
+        # --- [REAL ROBOT MODE] (SPEECH RECOGNITION) (COMMENTED OUT) ---
+        # recognized_word = self._listen_for_word(vocabulary, timeout)
+        # return {"status": "ok", "action": "listen", "result": recognized_word}
+
+    @staticmethod
+    def _read_line_with_timeout(timeout):
+        """
+        Reads one line from stdin, waiting at most `timeout` seconds.
+        Returns "" on timeout, matching the real-robot listen semantics.
+        """
+        deadline = _monotonic() + timeout
+        while True:
+            remaining = deadline - _monotonic()
+            if remaining <= 0:
+                print("\n[SIMULATION INPUT] Timed out waiting for input.")
+                return ""
+            ready, _, _ = select.select([sys.stdin], [], [], remaining)
+            if ready:
+                return sys.stdin.readline().rstrip("\n")
+
+    def _on_word(self, word_data):
+        """ALMemory callback: fires as soon as WordRecognized is raised.
+
+        This subsumes the cheaper "dirty flag + one getData" gating that a
+        polling loop would need: the recognized value arrives in the
+        callback argument itself, so no getData RPC happens at all.
+        """
+        # Word and confidence score
+        if word_data and word_data[0] and word_data[1] > 0.4:
+            self._word_result[0] = word_data[0]
+            self._word_event.set()
+
+    def _listen_for_word(self, vocabulary, timeout):
+        """
+        Real-robot word recognition, event-driven: blocks on a single
+        Event.wait(timeout) and is woken by _on_word the moment a word is
+        recognized, instead of the old getData polling loop. Only one
+        listen can be active at a time (the lock also protects the shared
+        event/result and vocabulary cache across worker threads).
+        """
+        with self._listen_lock:
+            return self._listen_for_word_locked(vocabulary, timeout)
+
+    def _listen_for_word_locked(self, vocabulary, timeout):
+        self._word_event.clear()
+        self._word_result[0] = ""
+        # Only reinstall the vocabulary when it actually changed.
+        vocab_key = tuple(vocabulary)
+        if vocab_key != self._last_vocab:
+            self.speech_recognition.pause(True)
+            self.speech_recognition.setVocabulary(vocabulary, False)
+            self.speech_recognition.pause(False)
+            self._last_vocab = vocab_key
+        if not self._reco_subscribed:
+            self.speech_recognition.subscribe("RobotListener")
+            self._reco_subscribed = True
+        # Clear any stale value so the callback only sees fresh words.
+        try:
+            self.memory.removeData("WordRecognized")
+        except Exception:
+            pass
+        self._word_event.wait(timeout)
+        if self._word_result[0]:
+            self.memory.removeData("WordRecognized")
+        return self._word_result[0]
+
 
 def main():
     print("--------------------------------------------------")
     print("   ROBOT LISTENER (PYTHON 2.7) - SIMULATION MODE  ")
     print("--------------------------------------------------")
+    _tune_scheduling()
     print("Connecting to Choregraphe at {}:{}...".format(ROBOT_IP, ROBOT_PORT))
     
     try:
@@ -184,22 +435,122 @@ def main():
     robot_controller = RobotController(app.session)
     robot_controller.tts.say("Connected to brain.")
 
-    context = zmq.Context()
-    socket = context.socket(zmq.REP)
-    socket.bind("tcp://*:5555")
-    print("\n[ZeroMQ] Server started on port 5555.")
+    # PULL/PUSH instead of REQ/REP: REP forces strict lock-step, so a
+    # multi-second say() or a 10-second listen() stalled every queued
+    # command behind it. With a PULL socket for incoming commands and a
+    # separate PUSH socket for completion acks (correlated by the echoed
+    # command "id"), the Brain can pipeline say + show_image +
+    # play_animation in one RTT instead of paying one RTT per command.
+    # The process-wide singleton context with a single I/O thread — one
+    # background thread is plenty for this message rate, and instance()
+    # avoids a second context (and thread) if anything else in the process
+    # needs ZMQ.
+    context = zmq.Context.instance(io_threads=1)
+    pull = context.socket(zmq.PULL)
+    push = context.socket(zmq.PUSH)
+    for sock in (pull, push):
+        # Don't block process exit flushing unsent messages.
+        sock.setsockopt(zmq.LINGER, 0)
+        # Fail sends immediately instead of queueing for absent peers.
+        sock.setsockopt(zmq.IMMEDIATE, 1)
+        # Bound queues so a runaway burst can't grow memory without limit.
+        sock.setsockopt(zmq.SNDHWM, 1000)
+        sock.setsockopt(zmq.RCVHWM, 1000)
+        # Detect a silently dead brain-side peer on real network links.
+        sock.setsockopt(zmq.TCP_KEEPALIVE, 1)
+    # Deeper queues on the hot direction of each socket: a burst of
+    # pipelined commands should queue here rather than block the Brain.
+    pull.setsockopt(zmq.RCVHWM, 10000)
+    push.setsockopt(zmq.SNDHWM, 10000)
+    pull.bind("tcp://*:5555")
+    push.bind("tcp://*:5556")
+    transports = ["tcp://*:5555 (commands)", "tcp://*:5556 (acks)"]
+
+    # In simulation the Brain runs on this same machine, so also offer
+    # ipc:// endpoints: a local unix socket skips the loopback TCP stack
+    # entirely. The Brain can connect to these instead of tcp://localhost.
+    if ROBOT_IP in ("127.0.0.1", "localhost"):
+        try:
+            pull.bind("ipc:///tmp/pepper_listener_cmd.sock")
+            push.bind("ipc:///tmp/pepper_listener_ack.sock")
+            transports.append("ipc:///tmp/pepper_listener_cmd.sock (commands)")
+            transports.append("ipc:///tmp/pepper_listener_ack.sock (acks)")
+        except zmq.ZMQError as e:
+            print("[ZeroMQ Warning] Could not bind ipc endpoints: {}".format(e))
+
+    print("\n[ZeroMQ] Server started on: {}".format(", ".join(transports)))
     print("[ZeroMQ] Waiting for commands from Python 3 Brain...\n")
 
-    while True:
-        # Wait for next request from client
-        message_str = socket.recv()
-        command = json.loads(message_str)
-        
-        # Process request
-        response = robot_controller.execute_command(command)
-        
-        # Send reply back to client
-        socket.send_json(response)
+    # Worker pool: a hand-rolled threading pool (Python 2.7 has no stdlib
+    # concurrent.futures). Workers execute NAOqi actions and hand the
+    # serialized acks back over an inproc:// socket registered with the
+    # poller, so the main loop wakes the instant an ack is ready instead
+    # of waiting out the poll timeout. Each worker connects its own PUSH
+    # socket from its own thread; only the main thread touches the TCP
+    # sockets, so nothing shares a (non-thread-safe) ZMQ socket.
+    command_queue = Queue.Queue()
+    ack_pull = context.socket(zmq.PULL)
+    ack_pull.setsockopt(zmq.LINGER, 0)
+    # inproc requires bind before any connect, so bind before the workers
+    # start.
+    ack_pull.bind("inproc://listener_acks")
+
+    def worker():
+        ack_push = context.socket(zmq.PUSH)
+        ack_push.setsockopt(zmq.LINGER, 0)
+        ack_push.connect("inproc://listener_acks")
+        while True:
+            command = command_queue.get()
+            try:
+                response = robot_controller.execute_command(command)
+                ack_push.send(json_fast.dumps(response))
+            finally:
+                command_queue.task_done()
+
+    for _ in range(WORKER_COUNT):
+        thread = threading.Thread(target=worker)
+        thread.daemon = True
+        thread.start()
+
+    # Poller-driven loop over both sockets: an incoming command or a
+    # finished ack each wake the poll immediately; the timeout only bounds
+    # how long Ctrl+C can go unnoticed. There is room to register further
+    # sockets (e.g. a priority-stop channel) without another thread.
+    poller = zmq.Poller()
+    poller.register(pull, zmq.POLLIN)
+    poller.register(ack_pull, zmq.POLLIN)
+
+    try:
+        while True:
+            socks = dict(poller.poll(100))
+
+            if socks.get(pull) == zmq.POLLIN:
+                # Plain recv: a copy=False Frame would not help here,
+                # since Frame.bytes allocates a fresh bytes object anyway
+                # and neither ujson nor stdlib json parses from a raw
+                # buffer on Python 2.
+                command_queue.put(json_fast.loads(pull.recv()))
+
+            if socks.get(ack_pull) == zmq.POLLIN:
+                # Forward every ready ack to the Brain. Wrapping the
+                # pre-serialized payload in a zmq.Frame with copy=False
+                # and track=False is pyzmq's lowest-overhead send: no
+                # encode step, no internal copy, no delivery-tracking
+                # MessageTracker. Acks may be out of command order — the
+                # Brain matches by echoed id.
+                while True:
+                    try:
+                        ack = ack_pull.recv(zmq.NOBLOCK)
+                    except zmq.Again:
+                        break
+                    push.send(zmq.Frame(ack), copy=False, track=False)
+    except KeyboardInterrupt:
+        print("\n[ZeroMQ] Interrupted. Shutting down...")
+    finally:
+        # LINGER=0 means close() drops unsent messages instead of hanging.
+        pull.close()
+        push.close()
+        ack_pull.close()
 
 
 if __name__ == "__main__":
@@ -3,13 +3,18 @@ import zmq
 import json
 
 context = zmq.Context()
-socket = context.socket(zmq.REQ)
-socket.connect("tcp://localhost:5555")
 
-# Send test command
-command = {"action": "say", "data": {"text": "Hello from test!"}}
-socket.send_json(command)
+# Commands go out on PUSH (listener PULLs on 5555); the completion ack
+# comes back on a separate PULL socket (listener PUSHes on 5556).
+push = context.socket(zmq.PUSH)
+push.connect("tcp://localhost:5555")
+pull = context.socket(zmq.PULL)
+pull.connect("tcp://localhost:5556")
 
-# Receive response
-response = socket.recv_json()
+# Send test command (the listener echoes the "id" in its ack)
+command = {"action": "say", "data": {"text": "Hello from test!"}, "id": 1}
+push.send(json.dumps(command).encode("utf-8"))
+
+# Receive the ack
+response = json.loads(pull.recv())
 print("Response:", response)